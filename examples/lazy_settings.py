@@ -0,0 +1,46 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# The same settings module as in env_as_config.py, but each setting
+# is read and decoded only when it's used for the first time.
+
+from smart_env import ENV
+
+
+ENV.enable_automatic_type_cast()
+
+
+settings = ENV.bind_module(__name__, {
+    'DEBUG': 'DEBUG',
+    'DATABASES': 'DATABASE_CONFIG',
+    'SENTRY_CONFIG': 'SENTRY_CONFIG',
+    'LOGGING_CONFIG': 'LOGGING_CONFIG',
+})
+
+
+# Latency-sensitive applications may still decode everything at once,
+# e.g. right after forking a worker:
+#
+#     import lazy_settings
+#     lazy_settings.settings.preload()
@@ -22,6 +22,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+from .backends import FrozenBackend
 from .env import ENV
+from .env import Env
 
-__all__ = ('ENV',)
+__all__ = ('ENV', 'Env', 'FrozenBackend')
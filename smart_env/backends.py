@@ -0,0 +1,163 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+
+import six
+
+try:
+    from collections.abc import Mapping
+    from collections.abc import MutableMapping
+except ImportError:  # Python 2
+    from collections import Mapping
+    from collections import MutableMapping
+
+
+__all__ = ('EnvironMirror', 'FrozenBackend')
+
+
+_MISSING = object()
+
+
+# Any mapping can be used as a backend for Env: os.environ (default),
+# a plain dict, or FrozenBackend for read-only configs. Setting and
+# unsetting variables requires backend to support item assignment
+# and deletion.
+
+
+class FrozenBackend(Mapping):
+    """Read-only backend with a copy of given variables"""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, variables=()):
+        self._data = dict(variables)
+
+    def __getitem__(self, name):
+        return self._data[name]
+
+    def get(self, name, default=None):
+        return self._data.get(name, default)
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        return six.viewkeys(self._data)
+
+    def items(self):
+        return six.viewitems(self._data)
+
+    def values(self):
+        return six.viewvalues(self._data)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._data)
+
+
+class EnvironMirror(MutableMapping):
+    """Backend keeping a plain str-keyed copy of os.environ
+
+    Reading os.environ encodes the key and decodes the value on each call,
+    while reading the mirror is a single dict lookup. Writes go to both
+    os.environ and the mirror.
+
+    Variables added or removed bypassing the mirror are detected by
+    comparing sizes when lookup fails, and the mirror is resynced.
+    Values replaced directly in os.environ are not detected, call
+    resync() after such changes.
+    """
+
+    def __init__(self, environ=None):
+        self._environ = os.environ if environ is None else environ
+        self._data = {}
+        self.resync()
+
+    def resync(self):
+        """Update the mirror from os.environ
+
+        The mirror dict is updated in place, as its get() is used by Env
+        directly (see getters()), and names which are still set never
+        disappear from it while concurrent readers use it.
+        """
+        data = dict(self._environ)
+        for name in [name for name in self._data if name not in data]:
+            self._data.pop(name, None)
+        self._data.update(data)
+
+    def __is_stale(self):
+        return len(self._environ) != len(self._data)
+
+    def getters(self):
+        """Return functions for Env to look variables up with: dict lookup
+        in the mirror, and get_missing() for names which are not there"""
+        return (self._data.get, self.get_missing)
+
+    def get_missing(self, name, default=None):
+        """Look up variable which was not found in the mirror, resyncing
+        it if variables were added or removed bypassing it"""
+        if self.__is_stale():
+            self.resync()
+        return self._data.get(name, default)
+
+    def get(self, name, default=None):
+        value = self._data.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self.get_missing(name, default)
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def __setitem__(self, name, value):
+        self._environ[name] = value
+        self._data[name] = value
+
+    def __delitem__(self, name):
+        try:
+            del self._environ[name]
+        finally:
+            self._data.pop(name, None)
+
+    def __iter__(self):
+        if self.__is_stale():
+            self.resync()
+        return iter(self._data)
+
+    def __len__(self):
+        if self.__is_stale():
+            self.resync()
+        return len(self._data)
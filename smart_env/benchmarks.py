@@ -0,0 +1,717 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# Micro-benchmarks for smart_env. Run all of them with:
+#
+#     python -m smart_env.benchmarks
+#
+# Each benchmark accepts a scale factor to make runs shorter or longer,
+# and returns a mapping of case name to seconds (unless the case name
+# says otherwise).
+
+from collections import OrderedDict
+import os
+import shutil
+import subprocess
+import sys
+import gc
+import json
+import tempfile
+import threading
+import timeit
+
+from . import engines
+from .backends import FrozenBackend
+from .decoders import decode_value
+from .decoders import decode_values
+from .env import ENV
+from .env import Env
+
+
+__all__ = ('BENCHMARKS', 'run')
+
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    """Register a benchmark function under given name"""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def measure(func, repeat=3, number=1):
+    """Return best time of a single func() call"""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def config_corpus(count, size):
+    """Generate raw values of Python-literal configs (single quotes),
+    which are decoded by CollectionDecoder after JSON attempt fails"""
+
+    corpus = OrderedDict()
+    for i in range(count):
+        items = ", ".join(
+            "'key_{0}': {{'host': 'host-{0}', 'port': {0}, "
+            "'tags': ['a', 'b']}}".format(j)
+            for j in range(size)
+        )
+        corpus['BENCH_CONFIG_{}'.format(i)] = '{' + items + '}'
+    return corpus
+
+
+class environment(object):
+    """Context manager temporarily setting environment variables"""
+
+    def __init__(self, variables):
+        self.variables = variables
+
+    def __enter__(self):
+        os.environ.update(self.variables)
+        return self.variables
+
+    def __exit__(self, *exc_info):
+        for name in self.variables:
+            os.environ.pop(name, None)
+
+
+@benchmark('decode_cache')
+def bench_decode_cache(scale=1):
+    """Cold-start decoding of large configs with and without disk cache"""
+
+    corpus = config_corpus(10, int(500 * scale) or 1)
+    directory = tempfile.mkdtemp()
+    auto_type_cast = ENV.is_auto_type_cast()
+
+    def decode_all():
+        for name in corpus:
+            getattr(ENV, name)
+
+    results = OrderedDict()
+    ENV.enable_automatic_type_cast()
+    try:
+        with environment(corpus):
+            ENV.disable_decode_cache()
+            results['without cache'] = measure(decode_all)
+
+            ENV.enable_decode_cache(directory, min_length=0)
+            decode_all()  # warm up the cache
+            results['with cache'] = measure(decode_all)
+    finally:
+        ENV.disable_decode_cache()
+        if not auto_type_cast:
+            ENV.disable_automatic_type_cast()
+        shutil.rmtree(directory)
+    return results
+
+
+@benchmark('parallel_decode')
+def bench_parallel_decode(scale=1):
+    """Serial vs process pool decoding of 12 values of growing size,
+    to find the size where parallel decoding starts paying off"""
+
+    results = OrderedDict()
+    for size in (100, 1000, 5000):
+        corpus = config_corpus(12, int(size * scale) or 1)
+        length = len(next(iter(corpus.values())))
+        with environment(corpus):
+            for workers in (1, None):
+                case = '{} {}KB'.format(
+                    'serial' if workers == 1 else 'parallel', length // 1024)
+                results[case] = measure(
+                    lambda: ENV.decode_all(corpus, workers, threshold=0))
+    return results
+
+
+@benchmark('backend_read')
+def bench_backend_read(scale=1):
+    """Latency of a single variable read for different backends"""
+
+    number = int(100000 * scale) or 1
+    variables = dict(('BENCH_VAR_{}'.format(i), str(i)) for i in range(100))
+    results = OrderedDict()
+
+    with environment(variables):
+        results['os.environ.get'] = measure(
+            lambda: os.environ.get('BENCH_VAR_50'), number=number)
+
+        for case, env in (('Env(os.environ)', Env()),
+                          ('Env(dict)', Env(dict(variables))),
+                          ('Env(FrozenBackend)',
+                           Env(FrozenBackend(variables)))):
+            results[case] = measure(lambda: env.BENCH_VAR_50, number=number)
+            results[case + ' missing'] = measure(lambda: env.BENCH_MISSING,
+                                                 number=number)
+    return results
+
+
+@benchmark('fast_lookup')
+def bench_fast_lookup(scale=1):
+    """Reading set and unset variables with and without environ mirror"""
+
+    number = int(100000 * scale) or 1
+    variables = dict(('BENCH_VAR_{}'.format(i), str(i)) for i in range(100))
+    results = OrderedDict()
+
+    with environment(variables):
+        results['os.environ.get'] = measure(
+            lambda: os.environ.get('BENCH_VAR_50'), number=number)
+        results['os.environ.get missing'] = measure(
+            lambda: os.environ.get('BENCH_MISSING'), number=number)
+
+        env = Env()
+        for case in ('os.environ', 'mirror'):
+            if case == 'mirror':
+                env.enable_fast_lookup()
+            results['Env({})'.format(case)] = measure(
+                lambda: env.BENCH_VAR_50, number=number)
+            results['Env({}) missing'.format(case)] = measure(
+                lambda: env.BENCH_MISSING, number=number)
+            results['Env({}) in'.format(case)] = measure(
+                lambda: 'BENCH_MISSING' in env, number=number)
+    return results
+
+
+@benchmark('diff_reload')
+def bench_diff_reload(scale=1):
+    """Reloading 10k variables where only 10 were changed: full
+    reapplying vs diff() and apply_diff()"""
+
+    count = int(10000 * scale) or 10
+    variables = dict(('BENCH_VAR_{}'.format(i), str(i)) for i in range(count))
+    reloaded = dict(variables)
+    for i in range(10):
+        reloaded['BENCH_VAR_{}'.format(i)] = 'changed'
+
+    results = OrderedDict()
+    env = Env(dict(variables))
+
+    def reapply():
+        for name, value in reloaded.items():
+            setattr(env, name, value)
+
+    results['reapply all'] = measure(reapply)
+    env = Env(dict(variables))
+    results['diff'] = measure(lambda: env.diff(reloaded))
+    results['diff + apply_diff'] = measure(
+        lambda: env.apply_diff(env.diff(reloaded)))
+    return results
+
+
+def service_corpus(count):
+    """Generate JSON configs of services sharing the same structure,
+    where every fifth value is a copy of another one"""
+
+    corpus = OrderedDict()
+    for i in range(count):
+        n = i - i % 5 if i % 5 == 4 else i
+        config = {
+            'name': 'service-{}'.format(n),
+            'replicas': [
+                {'host': 'host-{}.internal'.format(j), 'port': 8000 + j,
+                 'zone': 'zone-{}'.format(j % 3), 'enabled': True}
+                for j in range(50)
+            ],
+            'timeouts': {'connect': 1.5, 'read': 30, 'write': 30},
+            'tags': ['production', 'backend', 'critical'],
+        }
+        corpus['BENCH_SERVICE_{}'.format(i)] = json.dumps(config)
+    return corpus
+
+
+@benchmark('compact_store')
+def bench_compact_store(scale=1):
+    """Memory allocated for keeping decoded configs (in bytes)"""
+
+    try:
+        import tracemalloc
+    except ImportError:  # Python 2
+        return OrderedDict()
+
+    corpus = service_corpus(int(100 * scale) or 5)
+    results = OrderedDict()
+
+    with environment(corpus):
+        for case in ('plain', 'compact store', 'compact store, tuples'):
+            env = Env()
+            env.enable_automatic_type_cast()
+            if case != 'plain':
+                env.enable_compact_store(lists_as_tuples='tuples' in case)
+
+            tracemalloc.start()
+            kept = [getattr(env, name) for name in corpus]
+            results[case + ' (bytes)'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+    return results
+
+
+@benchmark('numeric_array')
+def bench_numeric_array(scale=1):
+    """Decoding a list of 100k floats into list vs array.array"""
+
+    try:
+        import tracemalloc
+    except ImportError:  # Python 2
+        tracemalloc = None
+
+    count = int(100000 * scale) or 1
+    variables = {'BENCH_WEIGHTS': json.dumps(
+        [i / 7.0 for i in range(count)])}
+    results = OrderedDict()
+
+    with environment(variables):
+        env = Env()
+        env.enable_automatic_type_cast()
+        for case, read in (
+                ('list', lambda: env.BENCH_WEIGHTS),
+                ('array', lambda: env.get_array('BENCH_WEIGHTS', 'd'))):
+            results[case] = measure(read)
+            if tracemalloc is None:
+                continue
+
+            tracemalloc.start()
+            value = read()
+            results[case + ' (bytes)'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del value
+    return results
+
+
+@benchmark('decode_many')
+def bench_decode_many(scale=1):
+    """Decoding 1k and 10k scalar values one by one vs in a batch"""
+
+    results = OrderedDict()
+    for count in (1000, 10000):
+        count = int(count * scale) or 1
+        values = [('true', '3.14', str(i), 'null')[i % 4]
+                  for i in range(count)]
+        results['decode_value() x {}'.format(count)] = measure(
+            lambda: [decode_value(value) for value in values])
+        results['decode_values() x {}'.format(count)] = measure(
+            lambda: decode_values(values))
+    return results
+
+
+@benchmark('prefetch')
+def bench_prefetch(scale=1):
+    """Reading 1k startup variables: cold, and after (possibly background)
+    prefetch of them"""
+
+    count = int(1000 * scale) or 1
+    backend = dict(('BENCH_{}'.format(i), ('true', '3.14', str(i), 'x')[i % 4])
+                   for i in range(count))
+    env = Env(backend)
+    env.enable_automatic_type_cast()
+
+    def read_all():
+        for name in backend:
+            getattr(env, name)
+
+    env.start_recording()
+    read_all()
+    manifest = env.stop_recording()
+
+    def prefetch_and_read_all():
+        start = timeit.default_timer()
+        env.prefetch(manifest)
+        middle = timeit.default_timer()
+        read_all()
+        return middle - start, timeit.default_timer() - middle
+
+    results = OrderedDict()
+    results['reads'] = measure(read_all)
+    timings = min(prefetch_and_read_all() for _ in range(3))
+    results['prefetch'], results['reads after prefetch'] = timings
+    return results
+
+
+@benchmark('interpolation')
+def bench_interpolation(scale=1):
+    """Expanding 10k variables, each referencing the previous one"""
+
+    count = int(10000 * scale) or 1
+    backend = dict(('BENCH_{}'.format(i), '${{BENCH_{}}}'.format(i - 1))
+                   for i in range(1, count))
+    backend['BENCH_0'] = 'value'
+    last = 'BENCH_{}'.format(count - 1)
+    env = Env(backend)
+    env.enable_interpolation()
+
+    def expand_all():
+        env.BENCH_0 = 'value'  # makes all variables expanded again
+        return env[last]
+
+    results = OrderedDict()
+    results['expand all'] = measure(expand_all)
+    results['read expanded'] = measure(lambda: env[last])
+    return results
+
+
+@benchmark('path')
+def bench_path(scale=1):
+    """Reading one leaf of small and large JSON documents"""
+
+    results = OrderedDict()
+    for size in (10, 10000):
+        size = int(size * scale) or 1
+        document = dict(('key_{}'.format(i), {'host': 'host-{}'.format(i)})
+                        for i in range(size))
+        env = Env({'BENCH_CONFIG': json.dumps(document)})
+        env.enable_automatic_type_cast()
+        results['decode x {}'.format(size)] = measure(
+            lambda: env.BENCH_CONFIG['key_0']['host'], number=100)
+        results['path() x {}'.format(size)] = measure(
+            lambda: env.path('BENCH_CONFIG.key_0.host'), number=100)
+    return results
+
+
+def split_tree(variables, prefix, sep):
+    """Build nested dicts with a scan of all variables per each nested
+    dict, like it's usually done by hand"""
+
+    start = prefix + sep
+    tree = {}
+    for name, value in variables.items():
+        if not name.startswith(start):
+            continue
+        key = name[len(start):].split(sep)[0]
+        if key in tree:
+            continue
+        if sep in name[len(start):]:
+            tree[key] = split_tree(variables, start + key, sep)
+        else:
+            tree[key] = decode_value(value)
+    return tree
+
+
+@benchmark('tree')
+def bench_tree(scale=1):
+    """Building nested config from 10k APP__GROUP__KEY variables"""
+
+    count = int(10000 * scale) or 1
+    backend = dict(('APP__GROUP_{}__KEY_{}'.format(i % 100, i), str(i))
+                   for i in range(count))
+    env = Env(backend)
+    env.enable_automatic_type_cast()
+
+    def tree():
+        env.BENCH_GENERATION = 1  # makes cached tree outdated
+        return env.tree('APP')
+
+    results = OrderedDict()
+    results['split by hand'] = measure(
+        lambda: split_tree(backend, 'APP', '__'))
+    results['tree()'] = measure(tree)
+    results['tree() cached'] = measure(lambda: env.tree('APP'))
+    return results
+
+
+@benchmark('consistent_reads')
+def bench_consistent_reads(scale=1):
+    """Reads of two variables through ENV.consistent() per second,
+    by 1, 2 and 4 threads together, while another thread updates them"""
+
+    count = int(10000 * scale) or 1
+    env = Env({'BENCH_A': '0', 'BENCH_B': '0'})
+    env.enable_automatic_type_cast()
+    stopped = threading.Event()
+
+    def write():
+        i = 0
+        while not stopped.is_set():
+            i += 1
+            env.update({'BENCH_A': i, 'BENCH_B': i})
+            stopped.wait(0.001)
+
+    def read():
+        for _ in range(count):
+            with env.consistent() as view:
+                view.BENCH_A, view.BENCH_B
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    results = OrderedDict()
+    try:
+        for threads in (1, 2, 4):
+            readers = [threading.Thread(target=read) for _ in range(threads)]
+            start = timeit.default_timer()
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+            elapsed = timeit.default_timer() - start
+            results['reads/s x {} threads'.format(threads)] = \
+                count * threads / elapsed
+    finally:
+        stopped.set()
+        writer.join()
+    return results
+
+
+def pathological_corpus(size):
+    """Generate values which are slow (or impossible) to decode"""
+
+    return OrderedDict([
+        ('large literal', '[' + ', '.join(["'x'"] * size) + ']'),
+        ('many lists', '[' + '[], ' * size + ']'),
+        ('deep nesting', '[' * size + ']' * size),
+    ])
+
+
+@benchmark('decode_budget')
+def bench_decode_budget(scale=1):
+    """Decoding pathological values with and without a decode budget"""
+
+    corpus = pathological_corpus(int(200000 * scale) or 1)
+    env = Env(corpus)
+    env.enable_automatic_type_cast()
+
+    def decode(name):
+        try:
+            env[name]
+        except (RuntimeError, MemoryError):  # RecursionError
+            pass
+
+    results = OrderedDict()
+    for name in corpus:
+        env.set_decode_budget()
+        results['{} without budget'.format(name)] = measure(
+            lambda: decode(name), repeat=1)
+        env.set_decode_budget(max_depth=32, max_items=10000, fallback=True)
+        results['{} with budget'.format(name)] = measure(
+            lambda: decode(name))
+    return results
+
+
+@benchmark('bytes')
+def bench_bytes(scale=1):
+    """Reading, decoding and writing 1 MB values of os.environ
+    as str and as bytes"""
+
+    size = int(1024 * 1024 * scale) or 1
+    value = json.dumps(['x' * 62] * (size // 64 or 1))
+    encoded = value.encode('ascii')
+    env = Env()
+    env.disable_automatic_type_cast()
+
+    results = OrderedDict()
+    with environment({'BENCH_VALUE': value}):
+        results['read str'] = measure(
+            lambda: env.BENCH_VALUE, number=10)
+        results['read bytes'] = measure(
+            lambda: env.bytes.BENCH_VALUE, number=10)
+        results['decode str'] = measure(
+            lambda: decode_value(env.BENCH_VALUE))
+        results['decode bytes'] = measure(
+            lambda: env.get_bytes('BENCH_VALUE', decode=True))
+        results['write str'] = measure(
+            lambda: setattr(env, 'BENCH_VALUE', value), number=10)
+        results['write bytes'] = measure(
+            lambda: env.set_bytes('BENCH_VALUE', encoded), number=10)
+    return results
+
+
+@benchmark('checkpoint')
+def bench_checkpoint(scale=1):
+    """Isolating a test which changes 5 of 10k variables: copying and
+    restoring os.environ vs checkpoint() and restore()"""
+
+    count = int(10000 * scale) or 1
+    variables = dict(('BENCH_VAR_{}'.format(i), str(i)) for i in range(count))
+    env = Env()
+
+    def change():
+        for i in range(5):
+            setattr(env, 'BENCH_VAR_{}'.format(i), 'changed')
+        env.BENCH_NEW = 'new'
+
+    def copy_and_restore():
+        saved = dict(os.environ)
+        change()
+        for name in set(os.environ) - set(saved):
+            del os.environ[name]
+        os.environ.update(saved)
+
+    def checkpoint_and_restore():
+        token = env.checkpoint()
+        change()
+        env.restore(token)
+
+    results = OrderedDict()
+    with environment(variables):
+        results['copy and restore'] = measure(copy_and_restore)
+        results['checkpoint and restore'] = measure(checkpoint_and_restore)
+    return results
+
+
+@benchmark('json_engine')
+def bench_json_engine(scale=1):
+    """Decoding a large JSON config and 10k JSON scalars with each
+    installed JSON engine"""
+
+    size = int(5000 * scale) or 1
+    config = json.dumps(dict(
+        ('key_{}'.format(i), {'host': 'host-{}'.format(i), 'port': i,
+                              'weight': i / 7.0, 'tags': ['a', 'b']})
+        for i in range(size)))
+    scalars = [str(i / 3.0) for i in range(int(10000 * scale) or 1)]
+
+    results = OrderedDict()
+    current = engines.get_json_engine()
+    try:
+        for name in engines.available_engines():
+            engines.set_json_engine(name)
+            results['{} config'.format(name)] = measure(
+                lambda: decode_value(config))
+            results['{} scalars'.format(name)] = measure(
+                lambda: decode_values(scalars))
+    finally:
+        engines.set_json_engine(current.name)
+    return results
+
+
+def private_memory():
+    """Return private dirty memory of current process in kB, or None
+    if it's not available (Linux only)"""
+
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Private_Dirty:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def fork_workers(workers, work):
+    """Fork workers, each calling work() and reporting its private
+    memory afterwards; return average private memory in kB"""
+
+    reports = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if not pid:  # worker
+            os.close(read_fd)
+            try:
+                work()
+                os.write(write_fd, str(private_memory()).encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            reports.append(int(f.read()))
+        os.waitpid(pid, 0)
+    return sum(reports) / float(len(reports))
+
+
+@benchmark('fork_memory')
+def bench_fork_memory(scale=1):
+    """Private memory (kB) of forked workers, which run garbage
+    collection, with and without ENV.freeze_for_fork()"""
+
+    results = OrderedDict()
+    if not hasattr(os, 'fork') or private_memory() is None:
+        return results
+
+    corpus = config_corpus(4, int(5000 * scale) or 1)
+
+    def fork(freeze):
+        env = Env(corpus)
+        env.enable_automatic_type_cast()
+        if freeze:
+            env.freeze_for_fork(corpus)
+
+        def read():
+            for name in corpus:
+                env.path(name + '.key_0.host')
+
+        def work():
+            gc.collect()
+            read()
+
+        read()  # decode values in the master process
+        return fork_workers(4, work)
+
+    results['without freeze'] = fork(False)
+    try:
+        results['with freeze'] = fork(True)
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+    return results
+
+
+@benchmark('external')
+def bench_external(scale=1):
+    """Spawning a child process with a large JSON config in a variable
+    and with a reference to it set by ENV.set_external(), and decoded
+    reads of both"""
+
+    results = OrderedDict()
+    if os.name != 'posix':
+        return results
+
+    # Linux doesn't accept single variables longer than 128 kB in exec()
+    size = int(2000 * scale) or 1
+    config = dict(('key_{}'.format(i), {'host': 'host-{}'.format(i)})
+                  for i in range(size))
+    inline = Env({})
+    inline.enable_automatic_type_cast()
+    inline.CONFIG = config
+    external = Env({})
+    external.enable_automatic_type_cast()
+    external.set_external('CONFIG', config, method='file')
+
+    command = [sys.executable, '-S', '-c', 'pass']
+    for name, env in (('inline', inline), ('external', external)):
+        child_env = dict(os.environ, **env.child_env())
+        results['spawn, {}'.format(name)] = measure(
+            lambda: subprocess.call(command, env=child_env))
+        results['decoded read, {}'.format(name)] = measure(
+            lambda: env.CONFIG)
+    external.set_external('CONFIG', None)
+    return results
+
+
+def run(names=None, scale=1):
+    """Run benchmarks and return their results by name"""
+    return OrderedDict((name, BENCHMARKS[name](scale))
+                       for name in (names or BENCHMARKS))
+
+
+def main():
+    for name, results in run().items():
+        print(name)
+        for case, value in results.items():
+            print("    {:<40} {:.6f}".format(case, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+
+from .backends import EnvironMirror
+
+
+__all__ = ('BytesView', 'ENVIRONB', 'fsdecode', 'fsencode', 'lookup_bytes')
+
+
+# os.environb is not available on Windows, and os.environ already
+# has bytes values on Python 2
+ENVIRONB = getattr(os, 'environb', None)
+
+try:
+    fsencode = os.fsencode
+    fsdecode = os.fsdecode
+except AttributeError:  # Python 2
+    def fsencode(value):
+        return value
+
+    def fsdecode(value):
+        return value
+
+
+def uses_environb(source):
+    """Check if source keeps variables of the process environment,
+    so they can be read from os.environb"""
+
+    return ENVIRONB is not None and (source is os.environ or
+                                     isinstance(source, EnvironMirror))
+
+
+def lookup_bytes(sources, name):
+    """Find value of variable in sources as bytes, or return None
+
+    The process environment is read through os.environb, without
+    decoding values, while str values of other sources are encoded
+    with filesystem encoding (like os.environb does).
+    """
+
+    for source in sources:
+        if uses_environb(source):
+            value = ENVIRONB.get(fsencode(name))
+        else:
+            value = source.get(name)
+            if value is not None and not isinstance(value, bytes):
+                value = fsencode(value)
+        if value is not None:
+            return value
+    return None
+
+
+class BytesView(object):
+    """Attribute access to variables of Env as bytes
+
+        ENV.bytes.CERTIFICATE            # b'...' or None
+        ENV.bytes['CERTIFICATE']         # raises KeyError if not set
+        ENV.bytes.CERTIFICATE = b'...'
+    """
+
+    __slots__ = ('_env',)
+
+    def __init__(self, env):
+        object.__setattr__(self, '_env', env)
+
+    def __getattr__(self, name):
+        return self._env.get_bytes(name)
+
+    def __getitem__(self, name):
+        value = self._env.get_bytes(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setattr__(self, name, value):
+        self._env.set_bytes(name, value)
+
+    def __delattr__(self, name):
+        delattr(self._env, name)
+
+    def __contains__(self, name):
+        return self._env.get_bytes(name) is not None
@@ -0,0 +1,117 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import re
+
+from .exceptions import DecodeBudgetExceeded
+
+
+__all__ = ('DecodeBudget',)
+
+
+_BRACKET = r'[\[\](){}]'
+
+# Characters which change state of the scan: brackets, comma, quotes
+# and backslash (escapes next character in a quoted string)
+_TOKEN = r'[\[\](){},"\'\\]'
+
+# (tokens, brackets, opening brackets, comma, quotes, backslash)
+# for str and bytes
+_TEXT_SYNTAX = (re.compile(_TOKEN), re.compile(_BRACKET),
+                '[({', ',', '"\'', '\\')
+
+_BYTES_SYNTAX = (re.compile(_TOKEN.encode('ascii')),
+                 re.compile(_BRACKET.encode('ascii')),
+                 b'[({', b',', b'"\'', b'\\')
+
+
+class DecodeBudget(object):
+    """Limits of values which are passed to decoders
+
+    Values are checked by a linear pre-scan, which is much cheaper
+    than parsing them: length is checked first, then number of items
+    (counted by commas and opening brackets) and nesting depth, so
+    the scan itself is bounded by the limits.
+    """
+
+    def __init__(self, max_length=None, max_depth=None, max_items=None,
+                 fallback=False):
+        self.max_length = max_length
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.fallback = fallback
+
+    def check(self, value):
+        """Raise DecodeBudgetExceeded if value exceeds any limit"""
+
+        if self.max_length is not None and len(value) > self.max_length:
+            raise DecodeBudgetExceeded('length', len(value), self.max_length)
+
+        token, bracket, opening, comma, quotes, backslash = \
+            _BYTES_SYNTAX if isinstance(value, bytes) else _TEXT_SYNTAX
+
+        if self.max_depth is None and self.max_items is None or \
+                not bracket.search(value):
+            return
+
+        # Single pass over special characters, skipping quoted strings,
+        # as they may contain any brackets and commas
+        max_items = self.max_items
+        max_depth = self.max_depth
+        items = depth = 0
+        quote = None
+        escaped = -1
+        for match in token.finditer(value):
+            char = match.group()
+            if quote is not None:
+                if match.start() == escaped:
+                    continue
+                if char == backslash:
+                    escaped = match.end()
+                elif char == quote:
+                    quote = None
+            elif char in quotes:
+                quote = char
+            elif char == comma or char in opening:
+                items += 1
+                if max_items is not None and items > max_items:
+                    raise DecodeBudgetExceeded('items', items, max_items)
+                if char != comma:
+                    depth += 1
+                    if max_depth is not None and depth > max_depth:
+                        raise DecodeBudgetExceeded('depth', depth, max_depth)
+            elif char != backslash:
+                depth -= 1
+
+    def allows(self, value):
+        """Check value, returning False instead of raising if budget
+        falls back to raw values"""
+
+        try:
+            self.check(value)
+        except DecodeBudgetExceeded:
+            if self.fallback:
+                return False
+            raise
+        return True
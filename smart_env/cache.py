@@ -0,0 +1,178 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from .decoders import SUPPORTED_DECODERS
+
+
+__all__ = ('DecodeCache',)
+
+
+def default_directory():
+    """Build cache directory path following XDG Base Directory spec"""
+    root = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    # Separate directory per Python version, as marshal format differs
+    return os.path.join(root, 'smart_env',
+                        'py{}{}'.format(*sys.version_info[0:2]))
+
+
+def _replace(source, destination):
+    """Atomically replace destination file with source one"""
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    else:  # Python 2
+        os.rename(source, destination)
+
+
+class DecodeCache(object):
+    """On-disk cache of decoded values
+
+    Each entry is stored in a separate file named after a hash of raw
+    value and the decoders chain, and contains a marshalled result.
+    Values shorter than min_length are not cached at all, as decoding
+    them is cheaper than a file lookup.
+    """
+
+    def __init__(self, directory=None, max_size=64 * 1024 * 1024,
+                 min_length=1024):
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+        self.min_length = min_length
+        self._size = None
+        self._salt = ':'.join(
+            decoder.__name__ for decoder in SUPPORTED_DECODERS
+        ).encode('utf-8') + b'\0'
+
+    def _path(self, value):
+        digest = hashlib.sha1(
+            self._salt + value.encode('utf-8', 'surrogatepass'))
+        return os.path.join(self.directory, digest.hexdigest())
+
+    def get(self, value):
+        """Return decoded value from cache, or raise KeyError"""
+
+        if len(value) < self.min_length:
+            raise KeyError(value)
+
+        path = self._path(value)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            raise KeyError(value)
+
+        try:
+            return marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            # Corrupted entry, it will be rewritten on next set()
+            self._remove(path)
+            raise KeyError(value)
+
+    def set(self, value, decoded):
+        """Store decoded value in cache
+
+        Values which cannot be marshalled are silently skipped,
+        as well as any filesystem errors.
+        """
+
+        if len(value) < self.min_length:
+            return
+
+        try:
+            data = marshal.dumps(decoded)
+        except ValueError:
+            return
+
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory,
+                                            prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            _replace(tmp_path, self._path(value))
+        except (IOError, OSError):
+            return
+
+        if self._size is not None:
+            self._size += len(data)
+        self._evict()
+
+    def clear(self):
+        """Remove all cache entries"""
+        for path, _, _ in self._entries():
+            self._remove(path)
+        self._size = 0
+
+    @property
+    def size(self):
+        """Total size of cache entries in bytes"""
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        return self._size
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove oldest entries until cache fits into max_size"""
+
+        if self.size <= self.max_size:
+            return
+
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        # Free some extra space to not rescan directory on each set()
+        limit = self.max_size * 0.9
+        for path, _, entry_size in entries:
+            if size <= limit:
+                break
+            self._remove(path)
+            size -= entry_size
+        self._size = size
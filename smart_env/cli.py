@@ -0,0 +1,252 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from six.moves import shlex_quote
+
+from .decoders import detect_decoder
+from .env import Env
+
+
+__all__ = ('main',)
+
+
+FORMATS = ('text', 'json', 'nul')
+
+# Names which can be used in "export" statement of POSIX shell
+_SHELL_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Values which look like collections, but can't be decoded, are reported
+# by "check" command, as they are most likely broken
+_COLLECTION = re.compile(r'^\s*[\[{]')
+
+
+def _jsonable(value):
+    """Convert decoded value into data which JSON can represent: keys
+    become strings, other collections become lists, and values of other
+    types (complex numbers, for example) their str()"""
+
+    if isinstance(value, dict):
+        return dict((key if isinstance(key, str) else _to_text(key),
+                     _jsonable(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_jsonable(item) for item in value), key=repr)
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+def _dumps(value):
+    """Encode decoded value as JSON, raising ValueError if it can't
+    be represented"""
+    try:
+        return json.dumps(_jsonable(value), sort_keys=True)
+    except (TypeError, ValueError, RuntimeError) as e:
+        raise ValueError(str(e))
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    return _dumps(value)
+
+
+def _write_lines(lines, fmt, stdout):
+    if fmt == 'nul':
+        stdout.write(''.join(line + '\0' for line in lines))
+    else:
+        stdout.write(''.join(line + '\n' for line in lines))
+
+
+def command_get(args, env, stdout, stderr):
+    """Print decoded values of many variables at once"""
+
+    env.enable_automatic_type_cast()
+    values = env.get_many(args.names)
+    missing = [name for name in args.names if name not in env]
+    for name in missing:
+        stderr.write("Variable is not set: {}\n".format(name))
+
+    try:
+        if args.format == 'json':
+            lines = [_dumps(values)]
+        else:
+            lines = [_to_text(values[name]) for name in args.names]
+    except ValueError as e:
+        stderr.write("Cannot encode value: {}\n".format(e))
+        return 1
+    _write_lines(lines, 'text' if args.format == 'json' else args.format,
+                 stdout)
+    return 1 if missing else 0
+
+
+def command_export(args, env, stdout, stderr):
+    """Print variables with given prefix, ready to be eval-ed by shell"""
+
+    variables = [(name, value) for name, value in env.items()
+                 if name.startswith(args.prefix)]
+    for name, _ in variables:
+        if not _SHELL_NAME.match(name):
+            stderr.write("Skipping invalid shell name: {!r}\n".format(name))
+    variables = [(name, value) for name, value in variables
+                 if _SHELL_NAME.match(name)]
+
+    if args.format == 'json':
+        stdout.write(_dumps(dict(variables)) + '\n')
+    elif args.format == 'nul':
+        _write_lines(['{}={}'.format(name, value)
+                      for name, value in variables], 'nul', stdout)
+    else:
+        _write_lines(['export {}={}'.format(name, shlex_quote(value))
+                      for name, value in variables], 'text', stdout)
+    return 0
+
+
+def command_check(args, env, stdout, stderr):
+    """Print decoder for each variable with given prefix, and fail
+    if some of them look like collections, but can't be decoded"""
+
+    report = []
+    invalid = []
+    for name, value in env.items():
+        if not name.startswith(args.prefix):
+            continue
+        decoder = detect_decoder(value)[0]
+        if decoder is None and _COLLECTION.match(value):
+            invalid.append(name)
+            stderr.write("Cannot decode variable: {}\n".format(name))
+        report.append((name, decoder.__name__ if decoder else None))
+
+    if args.format == 'json':
+        stdout.write(_dumps({
+            'decoders': dict(report),
+            'invalid': invalid,
+        }) + '\n')
+    else:
+        _write_lines(['{} {}'.format(name, decoder or '-')
+                      for name, decoder in report], args.format, stdout)
+    return 1 if invalid else 0
+
+
+def command_bench(args, env, stdout, stderr):
+    """Run micro-benchmarks"""
+
+    # Imported here, as benchmarks and stress test load modules (timeit,
+    # tracemalloc, multiprocessing) which other commands don't need
+    from . import benchmarks
+
+    unknown = set(args.names) - set(benchmarks.BENCHMARKS)
+    if unknown:
+        stderr.write("Unknown benchmarks: {}\n".format(
+            ', '.join(sorted(unknown))))
+        return 2
+
+    results = benchmarks.run(args.names, scale=args.scale)
+    if args.format == 'json':
+        stdout.write(json.dumps(results, indent=2) + '\n')
+        return 0
+
+    lines = []
+    for name, cases in results.items():
+        lines.append(name)
+        lines.extend("    {:<40} {:.6f}".format(case, value)
+                     for case, value in cases.items())
+    _write_lines(lines, args.format, stdout)
+    return 0
+
+
+def command_stress(args, env, stdout, stderr):
+    """Run stress test, printing results as JSON"""
+
+    from . import stress
+
+    parser = stress.build_parser(argparse.ArgumentParser(
+        prog='python -m smart_env stress',
+        description='Stress test of concurrent reads and writes'))
+    return stress.run_from_args(parser.parse_args(args.options), stdout)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m smart_env',
+        description='Read, export and check environment variables')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('-f', '--format', choices=FORMATS, default='text',
+                        help='output format (default: %(default)s)')
+
+    get = commands.add_parser('get', parents=[output],
+                              help='print decoded values of variables')
+    get.add_argument('names', nargs='+', metavar='NAME')
+    get.set_defaults(func=command_get)
+
+    export = commands.add_parser('export', parents=[output],
+                                 help='print shell "export" statements')
+    export.add_argument('prefix', nargs='?', default='')
+    export.set_defaults(func=command_export)
+
+    check = commands.add_parser('check', parents=[output],
+                                help='check that variables can be decoded')
+    check.add_argument('prefix', nargs='?', default='')
+    check.set_defaults(func=command_check)
+
+    bench = commands.add_parser('bench', parents=[output],
+                                help='run micro-benchmarks')
+    bench.add_argument('names', nargs='*', metavar='NAME')
+    bench.add_argument('--scale', type=float, default=1.0,
+                       help='scale factor of benchmark sizes')
+    bench.set_defaults(func=command_bench)
+
+    # Options of stress test are parsed by command_stress(), so that its
+    # module is only imported when it runs
+    stress_test = commands.add_parser(
+        'stress', add_help=False,
+        help='run stress test of concurrent reads and writes')
+    stress_test.set_defaults(func=command_stress)
+
+    return parser
+
+
+def main(argv=None, environ=None, stdout=None, stderr=None):
+    """Run command line interface, returning exit code"""
+
+    parser = build_parser()
+    args, options = parser.parse_known_args(argv)
+    if args.command == 'stress':
+        args.options = options
+    elif options:
+        parser.error('unrecognized arguments: {}'.format(' '.join(options)))
+    env = Env(os.environ if environ is None else environ)
+    return args.func(args, env, stdout or sys.stdout, stderr or sys.stderr)
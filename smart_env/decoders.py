@@ -23,11 +23,13 @@ THE SOFTWARE.
 """
 
 import abc
+import array
 import ast
-import json
+import re
 
 from six import with_metaclass
 
+from . import engines
 from .exceptions import DecodeError
 from .exceptions import EncodeError
 
@@ -36,7 +38,16 @@ __all__ = ('IDecoder',
            'JSONDecoder',
            'BooleanDecoder',
            'CollectionDecoder',
-           'SUPPORTED_DECODERS')
+           'ArrayDecoder',
+           'SUPPORTED_DECODERS',
+           'NOT_DECODED',
+           'decode_value',
+           'decode_values',
+           'detect_decoder')
+
+
+# Marks values which could not be decoded by IDecoder.decode_many()
+NOT_DECODED = object()
 
 
 class IDecoder(with_metaclass(abc.ABCMeta)):
@@ -54,6 +65,22 @@ class IDecoder(with_metaclass(abc.ABCMeta)):
         """Encode value using specified algorithm"""
         raise NotImplementedError
 
+    @classmethod
+    def decode_many(cls, values):
+        """Decode many values at once
+
+        Returns list of decoded values, where values which could not
+        be decoded are replaced with NOT_DECODED.
+        """
+
+        results = []
+        for value in values:
+            try:
+                results.append(cls.decode(value))
+            except DecodeError:
+                results.append(NOT_DECODED)
+        return results
+
 
 class JSONDecoder(IDecoder):
     """JSON-based decoder"""
@@ -71,13 +98,64 @@ class JSONDecoder(IDecoder):
             - "null" string (means None)
             - "true" string (means True)
             - "false" string (means False)
+
+        Value can also be UTF-8 encoded bytes.
         """
 
         try:
-            return json.loads(value)
+            return engines.loads(value)
         except (TypeError, ValueError):
             raise DecodeError
 
+    # Scalar values can be joined into a single JSON array without
+    # a risk to split or merge them in a different way
+    __NOT_SCALAR = re.compile(r'[,\[\]{}"]')
+
+    # Batches of this size or less are decoded item by item
+    __MIN_BATCH = 8
+
+    @classmethod
+    def decode_many(cls, values):
+        """Decode many values at once
+
+        Scalar values (numbers, true, false and null) are parsed with
+        a single loads() call for the whole batch. If it fails,
+        batch is split in halves, so a few invalid values don't make
+        all the others decoded one by one.
+        """
+
+        values = list(values)
+        results = [NOT_DECODED] * len(values)
+
+        scalars = []
+        for i, value in enumerate(values):
+            if isinstance(value, str) and not cls.__NOT_SCALAR.search(value):
+                scalars.append(i)
+            else:
+                results[i] = super(JSONDecoder, cls).decode_many(
+                    (value,))[0]
+
+        batches = [scalars]
+        while batches:
+            batch = batches.pop()
+            if len(batch) <= cls.__MIN_BATCH:
+                decoded = super(JSONDecoder, cls).decode_many(
+                    values[i] for i in batch)
+            else:
+                try:
+                    decoded = engines.loads(
+                        '[' + ','.join(values[i] for i in batch) + ']')
+                except ValueError:
+                    middle = len(batch) // 2
+                    batches.append(batch[:middle])
+                    batches.append(batch[middle:])
+                    continue
+
+            for i, item in zip(batch, decoded):
+                results[i] = item
+
+        return results
+
     @classmethod
     def encode(cls, value):
         """Encodes JSON-compatible object as string
@@ -91,7 +169,7 @@ class JSONDecoder(IDecoder):
             - bool
         """
         try:
-            return json.dumps(value)
+            return engines.dumps(value)
         except (TypeError, ValueError):
             raise EncodeError
 
@@ -108,11 +186,13 @@ class BooleanDecoder(IDecoder):
             - "False"
             - "true"
             - "false"
+
+        Value can also be bytes.
         """
 
-        if value in ("True", "true"):
+        if value in ("True", "true", b"True", b"true"):
             return True
-        if value in ("False", "false"):
+        if value in ("False", "false", b"False", b"false"):
             return False
         raise DecodeError
 
@@ -137,7 +217,7 @@ class BooleanDecoder(IDecoder):
                         type(value)
                     )
                 )
-            return json.dumps(value)
+            return engines.dumps(value)
         except (TypeError, ValueError):
             raise EncodeError
 
@@ -154,10 +234,14 @@ class CollectionDecoder(IDecoder):
             - set-like string
             - tuple-like string
             - dict-like string
+
+        Value can also be UTF-8 encoded bytes.
         """
         try:
+            if isinstance(value, bytes):
+                value = ast.parse(value, mode='eval')
             return ast.literal_eval(value)
-        except ValueError:
+        except (ValueError, SyntaxError):
             raise DecodeError
 
     @classmethod
@@ -178,13 +262,117 @@ class CollectionDecoder(IDecoder):
         try:
             if isinstance(value, (set, frozenset)):
                 value = list(value)
-            return json.dumps(value)
+            return engines.dumps(value)
         except TypeError:
             raise EncodeError
 
 
+class ArrayDecoder(IDecoder):
+    """Decoder for numeric lists into array.array
+
+    It's not used in automatic type cast, see Env.get_array().
+    """
+
+    @classmethod
+    def decode(cls, value, typecode='d'):
+        """Try to decode value assuming it's a list of numbers
+
+        Supported values:
+            - list-like string: "[1, 2, 3]"
+            - tuple-like string: "(1, 2, 3)"
+            - comma-separated string: "1, 2, 3"
+            - inclusive ranges for integer typecodes: "8000-8010, 9000"
+
+        Ranges are expanded directly into array, without building
+        an intermediate list.
+        """
+
+        text = value.strip()
+        if text[:1] + text[-1:] == '[]':
+            # C-accelerated JSON parser creates fewer temporary objects
+            # than splitting the string
+            try:
+                return array.array(typecode, engines.loads(text))
+            except (TypeError, ValueError, OverflowError):
+                pass
+
+        if text[:1] + text[-1:] in ('[]', '()'):
+            text = text[1:-1]
+
+        result = array.array(typecode)
+        if not text.strip():
+            return result
+
+        convert = float if typecode in ('f', 'd') else int
+        try:
+            for item in text.split(','):
+                result.extend(cls.__parse_item(item.strip(), convert))
+        except (ValueError, OverflowError, TypeError):
+            raise DecodeError
+        return result
+
+    @staticmethod
+    def __parse_item(item, convert):
+        start, sep, end = item[1:].partition('-')
+        if sep and convert is int:
+            return range(int(item[0] + start), int(end) + 1)
+        return (convert(item),)
+
+    @classmethod
+    def encode(cls, value):
+        """Encodes array of numbers into JSON-compatible string
+
+        Supported values:
+            - array.array
+        """
+        if not isinstance(value, array.array):
+            raise EncodeError
+        return engines.dumps(value.tolist())
+
+
 SUPPORTED_DECODERS = (
     JSONDecoder,
     BooleanDecoder,
     CollectionDecoder,
 )
+
+
+def detect_decoder(value):
+    """Find the first of SUPPORTED_DECODERS which can decode value
+
+    Returns (decoder, decoded value), or (None, value) if none of them
+    can decode it.
+    """
+
+    for decoder in SUPPORTED_DECODERS:
+        try:
+            return decoder, decoder.decode(value)
+        except DecodeError:
+            pass
+    else:
+        return None, value
+
+
+def decode_value(value):
+    """Decode value with the first of SUPPORTED_DECODERS which succeeds,
+    or return the source value otherwise"""
+    return detect_decoder(value)[1]
+
+
+def decode_values(values):
+    """Decode many values at once, like decode_value() does for one"""
+
+    results = list(values)
+    pending = list(range(len(results)))
+    for decoder in SUPPORTED_DECODERS:
+        if not pending:
+            break
+        decoded = decoder.decode_many([results[i] for i in pending])
+        failed = []
+        for i, item in zip(pending, decoded):
+            if item is NOT_DECODED:
+                failed.append(i)
+            else:
+                results[i] = item
+        pending = failed
+    return results
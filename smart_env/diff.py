@@ -0,0 +1,102 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import namedtuple
+
+import six
+
+from .decoders import decode_value
+
+
+__all__ = ('Change', 'EnvDiff', 'diff')
+
+
+class Change(namedtuple('Change', ('name', 'old', 'new'))):
+    """Change of a single variable
+
+    old is None for added variable, and new is None for removed one.
+    """
+
+    __slots__ = ()
+
+    @property
+    def old_decoded(self):
+        return None if self.old is None else decode_value(self.old)
+
+    @property
+    def new_decoded(self):
+        return None if self.new is None else decode_value(self.new)
+
+
+class EnvDiff(object):
+    """Set of changes between two states of environment"""
+
+    def __init__(self, added=(), removed=(), changed=()):
+        self.added = dict((change.name, change) for change in added)
+        self.removed = dict((change.name, change) for change in removed)
+        self.changed = dict((change.name, change) for change in changed)
+
+    def __iter__(self):
+        for changes in (self.removed, self.changed, self.added):
+            for name in sorted(changes):
+                yield changes[name]
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self):
+        return bool(len(self))
+
+    __nonzero__ = __bool__  # For Python 2
+
+    def __repr__(self):
+        return '<EnvDiff added={} removed={} changed={}>'.format(
+            sorted(self.added), sorted(self.removed), sorted(self.changed))
+
+
+def diff(old, new):
+    """Compute changes needed to turn old mapping of raw values into new one"""
+
+    if not isinstance(old, dict):
+        old = dict(six.iteritems(old))
+    if not isinstance(new, dict):
+        new = dict(six.iteritems(new))
+
+    if old == new:  # Cheap check for the most common case of no changes
+        return EnvDiff()
+
+    added = []
+    changed = []
+    get_old = old.get
+    for name, value in six.iteritems(new):
+        old_value = get_old(name)
+        if old_value is None:
+            added.append(Change(name, None, value))
+        elif old_value != value:
+            changed.append(Change(name, old_value, value))
+
+    removed = [Change(name, old[name], None)
+               for name in six.viewkeys(old) - six.viewkeys(new)]
+
+    return EnvDiff(added, removed, changed)
@@ -0,0 +1,147 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+import json
+import os
+import warnings
+
+import six
+
+
+__all__ = ('ENGINE_VARIABLE', 'JSONEngine', 'available_engines',
+           'get_json_engine', 'set_json_engine', 'loads', 'dumps')
+
+
+# Name of environment variable forcing JSON engine at import time
+ENGINE_VARIABLE = 'SMART_ENV_JSON_ENGINE'
+
+# Engines in order of preference for automatic selection
+PREFERENCE = ('orjson', 'ujson', 'json')
+
+# Numbers of 19 digits or more may not fit into 64 bits, and may be
+# parsed by accelerated engines differently (or as floats). They are
+# found by a substring search after mapping all digits to "0" and other
+# bytes to spaces, which is much faster than a regular expression.
+_DIGITS = bytes(bytearray(48 if 48 <= i <= 57 else 32 for i in range(256)))
+_LONG_NUMBER = b'0' * 19
+
+
+def _has_long_number(value):
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8', 'surrogatepass')
+    return _LONG_NUMBER in value.translate(_DIGITS)
+
+
+class JSONEngine(object):
+    """JSON parser used by decoders
+
+    Accelerated parsers are stricter than json module (for example,
+    about NaN or lone surrogates), so values they reject are parsed with
+    json again, as well as values with numbers of 19 digits or more,
+    which makes results identical to json module's ones. Encoding always
+    uses json module, as output of other engines is formatted differently.
+    """
+
+    def __init__(self, name, loads):
+        self.name = name
+        if loads is json.loads:
+            self.loads = loads
+        else:
+            self.loads = self.__with_fallback(loads)
+        self.dumps = json.dumps
+
+    @staticmethod
+    def __with_fallback(fast_loads):
+        def loads(value):
+            if not isinstance(value, (bytes, six.text_type)) or \
+                    _has_long_number(value):
+                return json.loads(value)
+            try:
+                return fast_loads(value)
+            except (TypeError, ValueError, OverflowError):
+                return json.loads(value)
+        return loads
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.name)
+
+
+def _find_engines():
+    engines = OrderedDict()
+    for name in PREFERENCE:
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        engines[name] = JSONEngine(name, module.loads)
+    return engines
+
+
+_ENGINES = _find_engines()
+
+_engine = None
+
+# Functions of the current engine, used by decoders
+loads = json.loads
+dumps = json.dumps
+
+
+def available_engines():
+    """Return names of installed JSON engines, in order of preference"""
+    return list(_ENGINES)
+
+
+def get_json_engine():
+    """Return current JSON engine"""
+    return _engine
+
+
+def set_json_engine(name=None):
+    """Select JSON engine by name ("orjson", "ujson" or "json"),
+    or the fastest installed one if name is None or "auto"
+
+    Raises ValueError if engine is not installed.
+    """
+
+    global _engine, loads, dumps
+
+    if name in (None, 'auto'):
+        name = next(iter(_ENGINES))
+    try:
+        engine = _ENGINES[name]
+    except KeyError:
+        raise ValueError("JSON engine is not available: {}".format(name))
+
+    _engine = engine
+    loads = engine.loads
+    dumps = engine.dumps
+    return engine
+
+
+try:
+    set_json_engine(os.environ.get(ENGINE_VARIABLE))
+except ValueError as error:
+    warnings.warn("{}, selecting it automatically".format(error))
+    set_json_engine()
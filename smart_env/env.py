@@ -22,35 +22,156 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+from collections import OrderedDict
+import contextlib
 import itertools
 import json
 import os
+import threading
 
-from six import with_metaclass
+import six
 
+try:
+    from collections.abc import ItemsView
+    from collections.abc import KeysView
+    from collections.abc import Mapping
+    from collections.abc import ValuesView
+except ImportError:  # Python 2
+    from collections import ItemsView
+    from collections import KeysView
+    from collections import Mapping
+    from collections import ValuesView
+
+from .backends import EnvironMirror
+from .binary import BytesView
+from .binary import ENVIRONB
+from .binary import fsdecode
+from .binary import fsencode
+from .binary import lookup_bytes
+from .backends import FrozenBackend
+from .decoders import ArrayDecoder
 from .decoders import SUPPORTED_DECODERS
-from .exceptions import DecodeError
+from .decoders import decode_value
+from .decoders import decode_values
 from .exceptions import EncodeError
-from .iterator import EnvIterator
+from .paths import compile_path
+
+# Modules of opt-in features (decode cache, parallel decoding, external
+# and shared values and others) are imported by methods which use them,
+# so importing smart_env doesn't load multiprocessing, tempfile, mmap
+# and hashlib for applications which only read variables
 
 
-__all__ = ('ENV',)
+__all__ = ('ENV', 'Env')
 
 
 UNDEFINED = None
 
+_MISSING = object()
+
+
+class Env(object):
+    """Environment wrapper
 
-class ClassProperty(type):
-    """Metaclass for enabling properties on class"""
+    Variables are stored in a backend, which is os.environ by default,
+    but can be any other mapping: a dict for per-tenant configs and tests,
+    or a FrozenBackend for read-only ones.
+    """
 
     __immutable_fields__ = ('enable_automatic_type_cast',
-                          'disable_automatic_type_cast')
-    __mutable_fields__ = ('_auto_type_cast',)
+                            'disable_automatic_type_cast',
+                            'is_auto_type_cast',
+                            'enable_decode_cache',
+                            'disable_decode_cache',
+                            'enable_compact_store',
+                            'disable_compact_store',
+                            'set_decode_budget',
+                            'set_sources',
+                            'enable_interpolation',
+                            'disable_interpolation',
+                            'add_secrets_dir',
+                            'enable_fast_lookup',
+                            'disable_fast_lookup',
+                            'decode_all',
+                            'snapshot',
+                            'diff',
+                            'apply_diff',
+                            'update',
+                            'consistent',
+                            'checkpoint',
+                            'restore',
+                            'bind_module',
+                            'start_recording',
+                            'stop_recording',
+                            'prefetch',
+                            'freeze_for_fork',
+                            'set_external',
+                            'enable_external_references',
+                            'disable_external_references',
+                            'child_env',
+                            'external_fds',
+                            'publish_shared',
+                            'attach_shared',
+                            'get',
+                            'get_array',
+                            'get_bytes',
+                            'set_bytes',
+                            'bytes',
+                            'path',
+                            'tree',
+                            'get_many',
+                            'keys',
+                            'items',
+                            'values',
+                            'backend')
+    __mutable_fields__ = ('_auto_type_cast', '_decode_cache',
+                          '_compact_store', '_sources', '_getters',
+                          '_backend', '_recorder', '_prefetched',
+                          '_interpolator', '_documents', '_generation',
+                          '_trees', '_lock', '_published',
+                          '_decode_budget', '_journal', '_checkpoints',
+                          '_frozen', '_externals', '_unpublished')
 
     __own_fields__ = __immutable_fields__ + __mutable_fields__
 
-    @staticmethod
-    def __decode(value):
+    # Set is used for checks on each variable access
+    __own_fields_set__ = frozenset(__own_fields__)
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = os.environ
+
+        self._backend = backend
+        self._auto_type_cast = False
+        self._decode_cache = False
+        self._compact_store = False
+        self._decode_budget = False
+        self._recorder = False
+        self._prefetched = {}
+        self._interpolator = False
+        self._documents = {}
+        self._generation = 0
+        self._trees = {}
+        self._lock = threading.RLock()
+        # (decoding options, read-only Env) of the last version published
+        # for consistent(), and names of variables changed since then
+        # (False until consistent() is used)
+        self._published = ((), None)
+        self._unpublished = False
+        # Undo journal of (name, previous raw value) while there are
+        # checkpoints to restore
+        self._journal = False
+        # (token, position in the journal) of checkpoints which are not
+        # restored yet
+        self._checkpoints = []
+        # Immutable decoded values by raw values, see freeze_for_fork()
+        self._frozen = {}
+        # References to external values and files written for them,
+        # see set_external(), created on first use
+        self._externals = False
+        self.set_sources((backend,))
+
+    def __decode(self, value):
         """Decodes data from environment variable if possible,
         or return the source value otherwise"""
         if value is UNDEFINED:  # Variable was not set in environment
@@ -60,15 +181,160 @@ class ClassProperty(type):
             raise TypeError("Value {} must be str, not {}".format(value,
                                                                   type(value)))
 
-        for decoder in SUPPORTED_DECODERS:
+        if self._frozen:
             try:
-                return decoder.decode(value)
-            except DecodeError:
+                return self._frozen[value]
+            except KeyError:
                 pass
-        else:
+
+        if value[:1] == '@' and self._externals:
+            value = self.__resolve(value)
+
+        store = self._compact_store
+        if store:
+            try:
+                return store.get(value)
+            except KeyError:
+                pass
+
+        budget = self._decode_budget
+        if budget and not budget.allows(value):
             return value
 
-    def __encode(cls, value):
+        decoded = _MISSING
+        if self._prefetched:
+            decoded = self._prefetched.pop(value, _MISSING)
+
+        cache = self._decode_cache
+        if cache and decoded is _MISSING:
+            try:
+                decoded = cache.get(value)
+            except KeyError:
+                pass
+
+        if decoded is _MISSING:
+            decoded = decode_value(value)
+            if cache:
+                cache.set(value, decoded)
+
+        if store:
+            return store.add(value, decoded)
+        return decoded
+
+    def __known(self, value):
+        """Return value decoded before (frozen, stored, prefetched
+        or cached), or raise KeyError"""
+
+        if self._frozen and value in self._frozen:
+            return self._frozen[value]
+        if self._compact_store:
+            try:
+                return self._compact_store.get(value)
+            except KeyError:
+                pass
+        decoded = _MISSING
+        if self._prefetched:
+            decoded = self._prefetched.pop(value, _MISSING)
+        if decoded is _MISSING and self._decode_cache:
+            decoded = self._decode_cache.get(value)
+        if decoded is _MISSING:
+            raise KeyError(value)
+        if self._compact_store:
+            return self._compact_store.add(value, decoded)
+        return decoded
+
+    def __keep(self, value, decoded):
+        """Cache and store value decoded out of __decode()"""
+
+        if self._decode_cache:
+            self._decode_cache.set(value, decoded)
+        if self._compact_store:
+            return self._compact_store.add(value, decoded)
+        return decoded
+
+    def __decode_many(self, values):
+        """Decodes many values at once, like __decode() does for one"""
+
+        store = self._compact_store
+        cache = self._decode_cache
+        budget = self._decode_budget
+        frozen = self._frozen
+        results = list(values)
+        pending = []
+        for i, value in enumerate(results):
+            if value is UNDEFINED:
+                continue
+            if frozen and value in frozen:
+                results[i] = frozen[value]
+                continue
+            if value[:1] == '@' and self._externals:
+                value = results[i] = self.__resolve(value)
+            if budget and not budget.allows(value):
+                continue
+            try:
+                if store:
+                    results[i] = store.get(value)
+                    continue
+                if cache:
+                    results[i] = cache.get(value)
+                    continue
+            except KeyError:
+                pass
+            pending.append(i)
+
+        decoded = decode_values([results[i] for i in pending])
+        for i, item in zip(pending, decoded):
+            if cache:
+                cache.set(results[i], item)
+            if store:
+                item = store.add(results[i], item)
+            results[i] = item
+        return results
+
+    def __resolve(self, reference):
+        """Return text of external value, or the reference itself
+        if it can't be read"""
+
+        resolved = self._externals.resolve(reference)
+        return reference if resolved is None else resolved
+
+    def __external_values(self):
+        """Return ExternalValues, creating them on first use"""
+
+        if not self._externals:
+            from .external import ExternalValues
+            self._externals = ExternalValues()
+        return self._externals
+
+    def __lookup(self, item):
+        """Find value of variable in sources, in their order (expanded,
+        if interpolation is enabled)"""
+
+        for get in self._getters:
+            value = get(item, UNDEFINED)
+            if value is not UNDEFINED:
+                return value
+        return UNDEFINED
+
+    def __raw_lookup(self, item):
+        """Find raw value of variable in sources, without expanding
+        references to other variables"""
+
+        for source in self._sources:
+            value = source.get(item, UNDEFINED)
+            if value is not UNDEFINED:
+                return value
+        return UNDEFINED
+
+    def __names(self):
+        """Return names of variables from all sources"""
+
+        sources = self._sources
+        if len(sources) == 1:
+            return list(sources[0])
+        return set().union(*sources)
+
+    def __encode(self, value):
         """Encodes data as text"""
 
         if isinstance(value, str):
@@ -82,94 +348,898 @@ class ClassProperty(type):
         else:
             raise ValueError("'{}' value is not serializable".format(value))
 
-    def __getattr__(cls, item):
-        if item in cls.__own_fields__:
-            return cls.__dict__[item]
-        if cls._auto_type_cast:
-            return cls.__decode(os.environ.get(item, UNDEFINED))
-        return os.environ.get(item, UNDEFINED)
+    @property
+    def backend(self):
+        """Mapping where variables are stored"""
+        return self._backend
+
+    def enable_automatic_type_cast(self):
+        """Enable automatic type cast"""
+        self._auto_type_cast = True
+
+    def disable_automatic_type_cast(self):
+        """Disable automatic type cast"""
+        self._auto_type_cast = False
+
+    def is_auto_type_cast(self):
+        """Shows if automatic type cast is enabled"""
+        return self._auto_type_cast
+
+    def enable_decode_cache(self, directory=None, max_size=64 * 1024 * 1024,
+                            min_length=1024):
+        """Enable persistent on-disk cache of decoded values
+
+        By default cache is stored under $XDG_CACHE_HOME/smart_env.
+        Only values of at least min_length characters are cached.
+        """
+        from .cache import DecodeCache
+        self._decode_cache = DecodeCache(directory, max_size, min_length)
+
+    def disable_decode_cache(self):
+        """Disable persistent cache of decoded values"""
+        self._decode_cache = False
+
+    def enable_compact_store(self, lists_as_tuples=False,
+                             max_string_length=64, max_entries=1024):
+        """Keep decoded values in a memory-compact store
+
+        Identical raw values share one decoded object, dict keys and
+        short strings are interned, and lists are optionally converted
+        into tuples. Decoded values are shared between all reads,
+        so they must not be modified. Up to max_entries least recently
+        read values are kept.
+
+        Returns the store, which reports its memory usage.
+        """
+        from .store import CompactStore
+        self._compact_store = CompactStore(lists_as_tuples, max_string_length,
+                                           max_entries)
+        return self._compact_store
+
+    def disable_compact_store(self):
+        """Decode values on each read again"""
+        self._compact_store = False
+
+    def set_decode_budget(self, max_length=None, max_depth=None,
+                          max_items=None, fallback=False):
+        """Limit length, nesting depth and number of items of values
+        which are decoded, to bound worst-case decoding time and memory
+
+        Values exceeding the budget raise DecodeBudgetExceeded, or are
+        returned raw if fallback is True. Call without limits to remove
+        the budget.
+        """
+
+        if max_length is None and max_depth is None and max_items is None:
+            self._decode_budget = False
+        else:
+            from .budget import DecodeBudget
+            self._decode_budget = DecodeBudget(max_length, max_depth,
+                                               max_items, fallback)
+
+    def set_sources(self, sources):
+        """Set mappings where variables are looked up, in their order
+
+        For example, to let a dict override environment variables
+        and fall back to Docker or Kubernetes secrets:
+
+            ENV.set_sources([overrides, os.environ,
+                             SecretsDirectory('/run/secrets')])
+
+        Setting and unsetting variables always changes the backend,
+        so include it into sources to see such changes.
+        """
+        self._sources = tuple(sources)
+        self._generation += 1
+        getters = []
+        for source in self._sources:
+            if isinstance(source, EnvironMirror):
+                getters.extend(source.getters())
+            else:
+                getters.append(source.get)
+        getters = tuple(getters)
+        if self._interpolator:
+            from .interpolation import Interpolator
+            self._interpolator = Interpolator(getters)
+            getters = (self._interpolator.get,)
+        self._getters = getters
+        with self._lock:
+            # All variables may be different, so next consistent()
+            # publishes them all again
+            self._published = ((), None)
+            self._unpublished = False
+
+    def enable_interpolation(self):
+        """Expand ${NAME} and ${NAME:-default} references to other
+        variables in values being read
+
+        Expanded values are memoized. Setting or unsetting a variable
+        through Env makes all variables which depend on it expanded
+        again on next read, while changes made bypassing Env are only
+        noticed for variables read directly. Raises InterpolationError
+        on read if variables reference each other in a cycle.
+        """
+        if not self._interpolator:
+            self._interpolator = True
+            self.set_sources(self._sources)
+
+    def disable_interpolation(self):
+        """Read values as they are"""
+        if self._interpolator:
+            self._interpolator = False
+            self.set_sources(self._sources)
+
+    def add_secrets_dir(self, path, min_interval=1.0):
+        """Append a directory with one file per variable to sources
+
+        Files are reread only if stat() shows they were changed,
+        and checked not more often than once per min_interval seconds.
+        """
+        from .sources import SecretsDirectory
+        self.set_sources(
+            self._sources + (SecretsDirectory(path, min_interval),))
+
+    def enable_fast_lookup(self):
+        """Read variables from a str-keyed mirror of os.environ
+
+        It makes reading variables (including unset ones) a single dict
+        lookup instead of going through os.environ key and value
+        re-encoding. Changes made through Env are applied to both,
+        while the mirror is resynced automatically only when variables
+        are added or removed bypassing it: call ENV.backend.resync()
+        after replacing values in os.environ directly.
+        """
+        if self._backend is os.environ:
+            self.__replace_backend(EnvironMirror())
+
+    def disable_fast_lookup(self):
+        """Read variables from os.environ directly"""
+        if isinstance(self._backend, EnvironMirror):
+            self.__replace_backend(os.environ)
+
+    def __replace_backend(self, backend):
+        """Replace backend, keeping its position among sources"""
+        self.set_sources(backend if source is self._backend else source
+                         for source in self._sources)
+        self._backend = backend
+
+    def decode_all(self, names, workers=None, threshold=None):
+        """Read and decode many variables at once
+
+        Values of at least threshold characters (256 KiB by default,
+        see parallel.DEFAULT_THRESHOLD) are decoded in a pool
+        of worker processes (one per CPU by default), the rest are decoded
+        in the current process. Use workers=1 to decode everything
+        serially. Variables are decoded regardless of automatic type cast
+        mode; unset ones are returned as None.
+
+        Returns OrderedDict of variable name to decoded value.
+        """
+
+        from . import parallel
+
+        if threshold is None:
+            threshold = parallel.DEFAULT_THRESHOLD
+        names = list(names)
+        budget = self._decode_budget
+        values = OrderedDict()
+        raw_values = {}
+        for name in names:
+            value = self.__lookup(name)
+            if value is UNDEFINED:
+                continue
+            if budget and not budget.allows(value):
+                raw_values[name] = value
+            else:
+                values[name] = value
+
+        decoded = parallel.decode_all(values, workers, threshold,
+                                      self.__decode, self.__known,
+                                      self.__keep)
+        decoded.update(raw_values)
+        return OrderedDict(
+            (name, decoded.get(name, UNDEFINED)) for name in names)
+
+    def snapshot(self, decode=False):
+        """Return read-only copy of raw (or decoded) values of all
+        variables"""
+
+        items = self.__raw_items()
+        if decode:
+            names = list(items)
+            items = zip(names, self.__decode_many(
+                [self.__lookup(name) for name in names]))
+        return FrozenBackend(items)
+
+    def __raw_items(self):
+        """Return dict with raw values of all variables"""
+
+        sources = self._sources
+        if len(sources) == 1:
+            return dict(six.iteritems(sources[0]))
+        return dict((name, self.__raw_lookup(name))
+                    for name in self.__names())
+
+    def diff(self, other):
+        """Compute changes needed to turn variables into other mapping
+        (or snapshot) of raw values
+
+        Returns EnvDiff with added, removed and changed variables, each
+        described by a Change with old and new raw values, which also
+        provides their decoded versions.
+        """
+        from .diff import diff
+        return diff(self.__raw_items(), other)
+
+    def apply_diff(self, changes):
+        """Set or unset only variables which are listed in changes,
+        atomically for consistent() readers"""
+
+        with self._lock:
+            for change in changes:
+                self.__assign(change.name, change.new)
+            self.__publish_changes()
+
+    def update(self, variables):
+        """Set (or unset, for None values) many variables at once,
+        atomically for consistent() readers"""
+
+        if isinstance(variables, Mapping):
+            variables = six.iteritems(variables)
+        with self._lock:
+            for name, value in variables:
+                self.__assign(name, value)
+            self.__publish_changes()
+
+    def checkpoint(self):
+        """Start recording changes made through Env, to undo them with
+        restore() later
+
+        Returns a token to be passed to restore(). Checkpoints can be
+        nested, restoring an outer one undoes inner ones too.
+        """
+
+        with self._lock:
+            if self._journal is False:
+                self._journal = []
+            token = object()
+            self._checkpoints.append((token, len(self._journal)))
+            return token
+
+    def restore(self, token):
+        """Undo changes made through Env since checkpoint was taken
+
+        Only changes are undone, so it takes time proportional to their
+        number rather than to number of variables.
+        """
+
+        with self._lock:
+            checkpoints = self._checkpoints
+            for index, (checkpoint, position) in enumerate(checkpoints):
+                if checkpoint is token:
+                    break
+            else:
+                raise ValueError("Checkpoint is already restored")
+
+            journal = self._journal
+            del checkpoints[index:]
+            backend = self._backend
+            while len(journal) > position:
+                name, value = journal.pop()
+                self.__drop_prefetched(name)
+                if value is None:
+                    try:
+                        del backend[name]
+                    except KeyError:
+                        pass
+                else:
+                    backend[name] = value
+                self.__changed(name)
+
+            if not checkpoints:
+                self._journal = False
+            self.__publish_changes()
+
+    def __record(self, name):
+        """Save current value of variable to undo journal, if there
+        are checkpoints, before it's set or unset"""
+
+        if self._journal is not False:
+            self._journal.append((name, self._backend.get(name)))
+        self.__drop_prefetched(name)
+
+    def __drop_prefetched(self, name):
+        """Forget value prefetched for current value of variable, which
+        is about to be set or unset, so it isn't kept if never read"""
+
+        if self._prefetched:
+            self._prefetched.pop(self.__lookup(name), None)
+
+    @contextlib.contextmanager
+    def consistent(self):
+        """Provide read-only Env with values of all variables as they
+        were after some write made through Env was completed
+
+        Writes made through Env are serialized, and a new version of
+        variables is published only once they are completed, so a view
+        never shows a multi-variable update (see update()) half-applied.
+        While nothing is written, readers share the last version without
+        taking the lock.
+
+            with ENV.consistent() as view:
+                url = 'http://{}:{}'.format(view.HOST, view.PORT)
+        """
+
+        options, view = self._published
+        if view is None or options != self.__options():
+            view = self.__publish()
+        yield view
+
+    def __options(self):
+        """Return options which change decoding of variables, to check
+        if published view decodes them the same way"""
+
+        return (self._auto_type_cast, self._decode_budget,
+                self._decode_cache, self._compact_store,
+                bool(self._interpolator))
+
+    def __publish(self):
+        """Publish read-only copy of current variables, decoded the
+        same way as variables of this Env
+
+        Variables are copied only when view is published for the first
+        time, later writes publish new versions themselves (see
+        __publish_changes()), and a change of decoding options only
+        makes a new view over the same copy.
+        """
+
+        with self._lock:
+            options, view = self._published
+            if view is None:
+                backend = FrozenBackend(self.__raw_items())
+                self._unpublished = set()
+            elif options != self.__options():
+                backend = view.backend
+            else:
+                return view
+            return self.__view(backend)
+
+    def __publish_changes(self):
+        """Publish new version with variables changed by the write
+        which is completed, if consistent() is used
 
-    def __delattr__(cls, item):
+        Previous version is copied and only changed variables are read,
+        so readers never wait for the lock or copy all variables.
+        """
+
+        changed = self._unpublished
+        if not changed:
+            return
+        self._unpublished = set()
+        variables = dict(self._published[1].backend)
+        for name in changed:
+            value = self.__raw_lookup(name)
+            if value is UNDEFINED:
+                variables.pop(name, None)
+            else:
+                variables[name] = value
+        self.__view(FrozenBackend(variables))
+
+    def __view(self, backend):
+        """Publish read-only Env over backend, decoding variables
+        the same way as this Env"""
+
+        view = Env(backend)
+        if self._auto_type_cast:
+            view.enable_automatic_type_cast()
+        if self._interpolator:
+            view.enable_interpolation()
+        view._decode_budget = self._decode_budget
+        view._decode_cache = self._decode_cache
+        view._compact_store = self._compact_store
+        view._frozen = self._frozen
+        view._externals = self._externals
+        self._published = (self.__options(), view)
+        return view
+
+    def bind_module(self, module_name, schema):
+        """Make variables available as lazily read module globals
+
+        schema is either a list of variable names, or a dict of setting
+        name to variable name. Typical usage in a settings module:
+
+            settings = ENV.bind_module(__name__, {'DATABASES': 'DB_CONFIG'})
+
+        Each setting is read (and decoded, if automatic type cast is
+        enabled) on first access and then stored in module globals.
+        Returns LazySettings, which preload() reads all settings at once.
+        Raises RuntimeError on Python < 3.7, which ignores module-level
+        __getattr__().
+        """
+        from .lazy import LazySettings
+        return LazySettings(self, module_name, schema)
+
+    def start_recording(self):
+        """Start recording names of variables which are read"""
+        self._recorder = OrderedDict()
+
+    def stop_recording(self, path=None):
+        """Stop recording and return manifest of variables read since
+        start_recording(), with decoders which succeeded for them
+
+        If path is given, manifest is also saved there as JSON,
+        to be used by prefetch() on next starts.
+        """
+
+        from .prefetch import build_manifest
+        from .prefetch import save_manifest
+
+        names = list(self._recorder or ())
+        self._recorder = False
+
+        # Decoders are detected for values as they are read and
+        # prefetched, that is expanded if interpolation is enabled
+        manifest = build_manifest((name, self.__lookup(name))
+                                  for name in names)
+        if path is not None:
+            save_manifest(manifest, path)
+        return manifest
+
+    def prefetch(self, manifest, background=False):
+        """Decode variables listed in manifest (or a path to it) at once
+
+        Decoded values are kept until they are read for the first time,
+        or until variables are set or unset through Env. With
+        background=True decoding runs in a daemon thread, which is
+        returned, so application can continue importing meanwhile.
+        """
+
+        from .prefetch import decode_manifest
+        from .prefetch import load_manifest
+
+        if isinstance(manifest, six.string_types):
+            manifest = load_manifest(manifest)
+
+        def decode():
+            self._prefetched.update(decode_manifest(manifest,
+                                                    self.__lookup))
+
+        if not background:
+            decode()
+            return None
+
+        thread = threading.Thread(target=decode, name='smart_env-prefetch')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def freeze_for_fork(self, names):
+        """Decode variables into immutable containers, and freeze all
+        objects tracked by garbage collector before forking workers
+
+        Decoded values are kept and returned on reads (if automatic type
+        cast is enabled) while raw values are the same, so workers share
+        their memory pages with the master process: gc.freeze() keeps
+        collections in workers from writing to them. Dicts are returned
+        as read-only mapping proxies and lists as tuples.
+
+        Returns FreezeReport.
+        """
+
+        from .fork import FreezeReport
+        from .fork import Freezer
+        from .fork import freeze_gc
+
+        freezer = Freezer()
+        variables = 0
+        for name in names:
+            value = self.__lookup(name)
+            if value is UNDEFINED:
+                continue
+            if value not in self._frozen:
+                self._frozen[value] = freezer.freeze(self.__decode(value))
+            variables += 1
+
+        return FreezeReport(variables, freezer.containers, freezer.size,
+                            freeze_gc())
+
+    def set_external(self, name, value, method='auto'):
+        """Set environment variable to a reference to encoded value
+        stored out of the environment
+
+        Value is written into a memfd ("@fd:7"), which descriptor is
+        inheritable, or into a temporary file ("@file:/tmp/...") if
+        memfd_create() is not available or method is 'file'.
+        Decoded reads resolve the reference, mapping the file and keeping
+        its text until it's changed. Pass child_env() and external_fds()
+        to subprocess.Popen() as env and pass_fds, and call
+        enable_external_references() in child processes to resolve
+        references there.
+
+        Setting None unsets variable and closes (or removes) the file
+        written for it before, as does setting, unsetting or restoring
+        the variable through Env in any other way.
+
+        Returns the reference.
+        """
+
+        from .external import write_external
+
+        externals = self.__external_values()
+        if value is UNDEFINED:
+            with self._lock:
+                delattr(self, name)
+                externals.replace(name)
+            return None
+
+        data = self.__encode(value).encode('utf-8', 'surrogateescape')
+        reference, owned = write_external(name, data, method)
+        with self._lock:
+            setattr(self, name, reference)
+            externals.replace(name, reference, owned)
+        return reference
+
+    def enable_external_references(self):
+        """Resolve references to external values inherited from parent
+        process, which called set_external()
+
+        Only memfds and temporary files of the same user written by
+        set_external() are read, other values which look like references
+        are returned as they are.
+        """
+        self.__external_values().inherited = True
+
+    def disable_external_references(self):
+        """Resolve only references to external values set by this
+        process (default)"""
+        if self._externals:
+            self._externals.inherited = False
+
+    def child_env(self):
+        """Return dict of raw values of variables for a child process,
+        with references to external values kept as is"""
+
+        return self.__raw_items()
+
+    def external_fds(self):
+        """Return tuple of memfd descriptors of external values set
+        by this process, to be passed to child processes"""
+
+        if not self._externals:
+            return ()
+        return self._externals.fds()
+
+    def publish_shared(self, names, path=None):
+        """Decode variables and publish them for worker processes
+
+        Decoded values are stored in a read-only memory-mapped segment,
+        which path is saved into SMART_ENV_SHARED variable, so forked
+        (or spawned) workers can find it with attach_shared().
+        Calling it again republishes values with a new version.
+        Unset variables are skipped.
+
+        Returns path to published segment.
+        """
+
+        from . import shared
+
+        if path is None:
+            path = self.__lookup(shared.SHARED_PATH_VARIABLE) or \
+                shared.default_path()
+
+        values = {}
+        for name in names:
+            value = self.__lookup(name)
+            if value is not UNDEFINED:
+                values[name] = self.__decode(value)
+        shared.publish(values, path)
+        setattr(self, shared.SHARED_PATH_VARIABLE, path)
+        return path
+
+    def attach_shared(self, path=None):
+        """Attach to values published by publish_shared()
+
+        Returns read-only mapping with lazily loaded values.
+        """
+
+        from . import shared
+
+        if path is None:
+            path = self.__lookup(shared.SHARED_PATH_VARIABLE)
+            if path is UNDEFINED:
+                raise ValueError("No shared config has been published")
+        return shared.SharedConfig(path)
+
+    def get(self, key, default=None):
+        """Return value of environment variable (decoded if automatic
+        type cast is enabled), or default if it's not set"""
+
+        if self._recorder is not False:
+            self._recorder[key] = None
+        value = self.__lookup(key)
+        if value is UNDEFINED:
+            return default
+        if self._auto_type_cast:
+            return self.__decode(value)
+        return value
+
+    def get_many(self, keys, default=None):
+        """Return dict of values of many environment variables (decoded
+        at once if automatic type cast is enabled), with default used
+        for unset ones"""
+
+        keys = list(keys)
+        raw_values = [self.__lookup(key) for key in keys]
+        values = self.__decode_many(raw_values) if self._auto_type_cast \
+            else raw_values
+        return dict((key, default if raw_value is UNDEFINED else value)
+                    for key, raw_value, value
+                    in zip(keys, raw_values, values))
+
+    @property
+    def bytes(self):
+        """View on variables as bytes: ENV.bytes.NAME, see get_bytes()"""
+        return BytesView(self)
+
+    def get_bytes(self, name, default=None, decode=False):
+        """Return value of environment variable as bytes, or default
+        if it's not set
+
+        Variables of the process environment are read from os.environb,
+        so values are neither decoded nor re-encoded, and non-UTF-8
+        content is kept as is. With decode=True, bytes are passed to
+        decoders directly instead.
+        """
+
+        value = lookup_bytes(self._sources, name)
+        if value is None:
+            return default
+        if decode:
+            budget = self._decode_budget
+            if budget and not budget.allows(value):
+                return value
+            return decode_value(value)
+        return value
+
+    def set_bytes(self, name, value):
+        """Set environment variable to bytes value
+
+        In the process environment it's set through os.environb, without
+        decoding the value.
+        """
+
+        if not isinstance(value, bytes):
+            raise TypeError("Value must be bytes, not {}".format(type(value)))
+        with self._lock:
+            self.__record(name)
+            if self._backend is os.environ and ENVIRONB is not None:
+                ENVIRONB[fsencode(name)] = value
+            else:
+                self._backend[name] = fsdecode(value)
+            self.__changed(name)
+            self.__publish_changes()
+
+    def __changed(self, name):
+        """Forget everything derived from variable which was set or
+        unset through Env, and release file of its external value
+        if it doesn't refer to it anymore"""
+
+        if self._externals:
+            self._externals.release(name, self._backend.get(name))
+        self._generation += 1
+        if self._interpolator:
+            self._interpolator.invalidate(name)
+        if self._unpublished is not False:
+            self._unpublished.add(name)
+
+    def get_array(self, key, typecode='d', default=None):
+        """Return value of environment variable decoded into array.array
+        of given typecode, or default if it's not set
+
+        Value can be a list of numbers ("[1, 2, 3]" or "1, 2, 3"), and
+        for integer typecodes it may contain ranges ("8000-8010, 9000").
+        Use memoryview() on result for zero-copy access to the numbers.
+        Raises DecodeError if value is not a list of numbers.
+        """
+
+        value = self.__lookup(key)
+        if value is UNDEFINED:
+            return default
+        return ArrayDecoder.decode(value, typecode)
+
+    def path(self, expression, default=None):
+        """Return value at dotted path in decoded value of variable,
+        or default if variable or path is not found
+
+        For example, ENV.path("DATABASES.default.HOST") for DATABASES
+        with a JSON dict. Numeric segments select items of lists, and
+        wildcard ("SERVERS.*.host") makes result a list of all values
+        found. Paths are parsed once, and decoded value is kept until
+        raw value of variable changes, so it must not be modified.
+        """
+
+        compiled = compile_path(expression)
+        name = compiled.name
+        value = self.__lookup(name)
+        if value is UNDEFINED:
+            return default
+
+        document = self._documents.get(name)
+        if document is None or document[0] != value:
+            document = self._documents[name] = (value, self.__decode(value))
+        return compiled.get(document[1], default)
+
+    def tree(self, prefix, sep='__'):
+        """Return nested dicts and lists built from names of variables
+        starting with prefix and sep, and their decoded values
+
+        For example, APP__DB__HOST=db and APP__HOSTS__0=a give
+        {'DB': {'HOST': 'db'}, 'HOSTS': ['a']} for ENV.tree('APP').
+        Result is cached until variables are set or unset through Env,
+        so it must not be modified.
+        """
+
+        key = (prefix, sep)
+        generation = self._generation
+        cached = self._trees.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        from .tree import build_tree
+
+        start = prefix + sep
+        names = [name for name in self.__names() if name.startswith(start)]
+        values = self.__decode_many([self.__lookup(name) for name in names])
+        tree = build_tree(((name[len(start):], value)
+                           for name, value in zip(names, values)), sep)
+        # Generation read before names, so a write made meanwhile makes
+        # the tree built again on next call
+        self._trees[key] = (generation, tree)
+        return tree
+
+    def keys(self):
+        """Return a view on names of environment variables"""
+        return KeysView(self)
+
+    def items(self):
+        """Return a view on (name, value) pairs of environment variables.
+
+        Values are read (and decoded, if automatic type cast is enabled)
+        lazily while iterating the view.
+        """
+        return ItemsView(self)
+
+    def values(self):
+        """Return a view on values of environment variables.
+
+        Values are read (and decoded, if automatic type cast is enabled)
+        lazily while iterating the view.
+        """
+        return ValuesView(self)
+
+    def __getitem__(self, item):
+        """Return value of environment variable, like __getattr__()
+        does, but raise KeyError if variable is not set"""
+
+        if self._recorder is not False:
+            self._recorder[item] = None
+        value = self.__lookup(item)
+        if value is UNDEFINED:
+            raise KeyError(item)
+        if self._auto_type_cast:
+            return self.__decode(value)
+        return value
+
+    def __len__(self):
+        """Return number of environment variables"""
+
+        sources = self._sources
+        if len(sources) == 1:
+            return len(sources[0])
+        return len(self.__names())
+
+    def __getattr__(self, item):
+        if item in self.__own_fields_set__:
+            try:
+                return self.__dict__[item]
+            except KeyError:  # Not initialized yet, e.g. by copy.copy()
+                raise AttributeError(item)
+        if self._recorder is not False:
+            self._recorder[item] = None
+        # Most variables are found by the first getter, which is a dict
+        # lookup with fast lookup enabled
+        value = self._getters[0](item)
+        if value is UNDEFINED:
+            value = self.__lookup(item)
+        if self._auto_type_cast:
+            return self.__decode(value)
+        return value
+
+    def __delattr__(self, item):
         """Unset environment variable"""
-        if item in cls.__own_fields__:
+        if item in self.__own_fields__:
             raise AttributeError(
                 "Own attribute '{}' cannot be deleted".format(item))
         # NOTE(albartash): If environment variable is not set,
         #                  it can be safely unset more times.
         #                  This behaviour is different from native
         #                  del os.environ[k] which would raise KeyError
-        try:
-            del os.environ[item]
-        except KeyError:
-            pass
+        with self._lock:
+            self.__assign(item, UNDEFINED)
+            self.__publish_changes()
 
-    def __setattr__(cls, key, value):
-        if key in cls.__immutable_fields__:
-            raise AttributeError(
-                "Own attribute '{}' cannot be reinitialized".format(key))
+    def __setattr__(self, key, value):
+        if key in self.__mutable_fields__:
+            super(Env, self).__setattr__(key, value)
+            return
 
-        if key in cls.__mutable_fields__:
-            super(ClassProperty, cls).__setattr__(key, value)
+        with self._lock:
+            self.__assign(key, value)
+            self.__publish_changes()
 
-        if value is UNDEFINED:  # means - unset variable
-            delattr(cls, key)
-            return
+    def __assign(self, name, value):
+        """Set (or unset, for None value) variable, without publishing
+        the change for consistent() readers"""
+
+        if name in self.__own_fields_set__:
+            raise AttributeError(
+                "Own attribute '{}' cannot be reinitialized".format(name))
 
-        os.environ[key] = cls.__encode(value)
+        if value is UNDEFINED:  # means - unset variable
+            self.__record(name)
+            try:
+                del self._backend[name]
+            except KeyError:
+                pass
+        else:
+            value = self.__encode(value)
+            self.__record(name)
+            self._backend[name] = value
+        self.__changed(name)
 
-    def __contains__(cls, item):
+    def __contains__(self, item):
         """Check if environment variable is set"""
 
         # Class' own fields should not appear as existing
         # environment variables
-        if item in cls.__own_fields__:
+        if item in self.__own_fields_set__:
             return False
 
-        return os.environ.get(item, UNDEFINED) is not UNDEFINED
+        return self.__lookup(item) is not UNDEFINED
 
-    def __str__(cls):
-        """Returns a string representation of os.environ object.
+    def __str__(self):
+        """Returns a string representation of environment variables.
 
         In this case, values are not decoded from their string equivalents
         in the OS environment. For convenience, json.dumps() is used.
         """
 
-        return json.dumps(dict(os.environ))
+        return json.dumps(dict((name, self.__lookup(name))
+                               for name in self.__names()))
 
-    def __repr__(cls):
+    def __repr__(self):
         """Returns a string with sorted list of environment variables"""
 
-        return str(sorted(os.environ.keys()))
+        return str(sorted(self.__names()))
 
     def __iter__(self):
-        return EnvIterator(sorted(os.environ.keys()))
+        """Iterate over sorted names of environment variables.
+
+        Names are taken at the moment of call, so it's safe to set
+        or unset variables while iterating.
+        """
+        return iter(sorted(self.__names()))
 
     def __dir__(self):
         """Returns list of environment variables + own fields"""
 
         return sorted(
             itertools.chain(self.__own_fields__,
-                            os.environ.keys()
-            )
+                            self.__names())
         )
 
 
-class ENV(with_metaclass(ClassProperty)):
-    """Environment wrapper"""
+Mapping.register(Env)
 
-    _auto_type_cast = False
-
-    @classmethod
-    def enable_automatic_type_cast(cls):
-        """Enable automatic type cast"""
-        cls._auto_type_cast = True
 
-    @classmethod
-    def disable_automatic_type_cast(cls):
-        """Disable automatic type cast"""
-        cls._auto_type_cast = False
-
-    @classmethod
-    def is_auto_type_cast(cls):
-        """Shows if automatic type cast is enabled"""
-        return cls._auto_type_cast
+ENV = Env()
@@ -27,7 +27,8 @@ import abc
 from six import with_metaclass
 
 
-__all__ = ('DecodeError', 'EncodeError', 'EnvException')
+__all__ = ('DecodeError', 'DecodeBudgetExceeded', 'EncodeError',
+           'EnvException', 'InterpolationError')
 
 
 class EnvException(with_metaclass(abc.ABCMeta, Exception)):
@@ -38,5 +39,27 @@ class DecodeError(EnvException):
     """Error while trying to decode value with type checking"""
 
 
+class DecodeBudgetExceeded(DecodeError):
+    """Value is too large or too deeply nested to be decoded"""
+
+    def __init__(self, limit, value, maximum):
+        super(DecodeBudgetExceeded, self).__init__(
+            "Value exceeds decode budget: {} {} > {}".format(
+                limit, value, maximum))
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+
+
 class EncodeError(EnvException):
     """Error while trying to encode value"""
+
+
+class InterpolationError(EnvException):
+    """Error while trying to expand references to other variables"""
+
+    def __init__(self, cycle):
+        super(InterpolationError, self).__init__(
+            "Cyclic reference between variables: {}".format(
+                ' -> '.join(cycle)))
+        self.cycle = cycle
@@ -0,0 +1,207 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import mmap
+import os
+import re
+import tempfile
+
+from .binary import fsdecode
+
+
+__all__ = ('ExternalValues', 'REFERENCE', 'is_reference', 'write_external')
+
+
+# "@fd:7" or "@file:/absolute/path", nothing else is resolved
+REFERENCE = re.compile(r'\A@(?:fd:(\d{1,9})|file:(/[^\x00]+))\Z')
+
+METHODS = ('auto', 'memfd', 'file')
+
+
+def is_reference(value):
+    """Check if raw value is a reference to an external value"""
+    return value[:1] == '@' and REFERENCE.match(value) is not None
+
+
+def _memfd_create(name):
+    if not hasattr(os, 'memfd_create'):  # Not Linux, or Python < 3.8
+        return None
+    try:
+        return os.memfd_create('smart_env:{}'.format(name), 0)
+    except OSError:
+        return None
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def write_external(name, data, method='auto'):
+    """Write bytes into a memfd (or a temporary file) which is inherited
+    by child processes
+
+    Returns reference to be stored in variable, and file descriptor
+    or path of the file.
+    """
+
+    if method not in METHODS:
+        raise ValueError("Unknown method: {}".format(method))
+
+    fd = None if method == 'file' else _memfd_create(name)
+    if fd is None and method == 'memfd':
+        raise OSError("memfd_create() is not available")
+
+    if fd is not None:
+        os.set_inheritable(fd, True)
+        _write_all(fd, data)
+        return '@fd:{}'.format(fd), fd
+
+    fd, path = tempfile.mkstemp(prefix='smart_env-{}-'.format(name))
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+    return '@file:{}'.format(path), path
+
+
+def _is_external_fd(fd):
+    """Check if file descriptor is a memfd written by write_external()"""
+    try:
+        target = os.readlink('/proc/self/fd/{}'.format(fd))
+    except OSError:  # Not Linux
+        return False
+    return target.startswith('/memfd:smart_env:')
+
+
+def _is_external_file(path):
+    """Check if path is a temporary file written by write_external()"""
+    directory, name = os.path.split(path)
+    return directory == tempfile.gettempdir() and \
+        name.startswith('smart_env-')
+
+
+class ExternalValues(object):
+    """Resolves references to external values, and owns files written
+    by this process
+
+    Only references written by this process are resolved, unless
+    references inherited from parent process are accepted: then they
+    must point to a memfd or a temporary file (owned by the same user)
+    written by write_external(), so a variable set to "@file:/etc/..."
+    is never replaced with contents of that file.
+
+    Resolved values are memoized until stat() shows the file was
+    changed, so reading a variable again costs a single fstat().
+    """
+
+    def __init__(self):
+        # reference -> (stat key, value)
+        self._resolved = {}
+        # variable name -> (reference, file descriptor or path)
+        self._owned = {}
+        # References written by this process
+        self._references = set()
+        self.inherited = False
+
+    def resolve(self, reference):
+        """Return text of external value, or None if reference can't
+        be resolved (it's not a reference or it's not accepted, file
+        descriptor is not open, file is removed)"""
+
+        own = reference in self._references
+        if not own and not self.inherited:
+            return None
+
+        match = REFERENCE.match(reference)
+        if match is None:
+            return None
+        fd, path = match.groups()
+        try:
+            if fd is not None:
+                fd = int(fd)
+                if not own and not _is_external_fd(fd):
+                    return None
+                return self.__resolve(reference, fd)
+            if not own and not _is_external_file(path):
+                return None
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+            try:
+                if not own and os.fstat(fd).st_uid != os.getuid():
+                    return None
+                return self.__resolve(reference, fd)
+            finally:
+                os.close(fd)
+        except (OSError, ValueError):
+            return None
+
+    def __resolve(self, reference, fd):
+        info = os.fstat(fd)
+        key = (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns)
+        resolved = self._resolved.get(reference)
+        if resolved is not None and resolved[0] == key:
+            return resolved[1]
+
+        if info.st_size:
+            with mmap.mmap(fd, info.st_size, access=mmap.ACCESS_READ) as data:
+                value = fsdecode(data[:])
+        else:
+            value = ''
+        self._resolved[reference] = (key, value)
+        return value
+
+    def replace(self, name, reference=None, owned=None):
+        """Remember file written for variable, closing or removing
+        the one written for it before"""
+
+        previous = self._owned.pop(name, None)
+        if previous is not None:
+            previous_reference, previous = previous
+            self._references.discard(previous_reference)
+            self._resolved.pop(previous_reference, None)
+            if isinstance(previous, int):
+                os.close(previous)
+            else:
+                try:
+                    os.unlink(previous)
+                except OSError:
+                    pass
+        if reference is not None:
+            self._owned[name] = (reference, owned)
+            self._references.add(reference)
+
+    def release(self, name, value):
+        """Close or remove file written for variable, unless it's still
+        set to the reference to that file (value is None if variable
+        was unset)"""
+
+        owned = self._owned.get(name)
+        if owned is not None and owned[0] != value:
+            self.replace(name)
+
+    def fds(self):
+        """Return file descriptors of values written by this process"""
+        return tuple(owned for _, owned in self._owned.values()
+                     if isinstance(owned, int))
@@ -0,0 +1,89 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import namedtuple
+import gc
+import sys
+
+import six
+
+try:
+    from types import MappingProxyType
+except ImportError:  # Python 2
+    MappingProxyType = None
+
+
+__all__ = ('FreezeReport', 'Freezer', 'freeze_gc')
+
+
+# Result of Env.freeze_for_fork(): number of variables frozen, number
+# of containers created, their approximate size in bytes (with all
+# contents), and number of objects moved to the permanent generation
+# of garbage collector (0 if gc.freeze() is not available)
+FreezeReport = namedtuple('FreezeReport',
+                          ('variables', 'containers', 'size', 'gc_objects'))
+
+
+class Freezer(object):
+    """Converts decoded values into immutable containers
+
+    Dicts become read-only mapping proxies (plain dicts on Python 2),
+    lists become tuples and sets become frozensets.
+    """
+
+    def __init__(self):
+        self.containers = 0
+        self.size = 0
+
+    def freeze(self, value):
+        """Return immutable copy of value"""
+
+        if isinstance(value, dict):
+            frozen = dict((self.freeze(key), self.freeze(item))
+                          for key, item in six.iteritems(value))
+            self.size += sys.getsizeof(frozen)
+            if MappingProxyType is not None:
+                frozen = MappingProxyType(frozen)
+        elif isinstance(value, (list, tuple)):
+            frozen = tuple(self.freeze(item) for item in value)
+        elif isinstance(value, (set, frozenset)):
+            frozen = frozenset(self.freeze(item) for item in value)
+        else:
+            self.size += sys.getsizeof(value)
+            return value
+
+        self.containers += 1
+        self.size += sys.getsizeof(frozen)
+        return frozen
+
+
+def freeze_gc():
+    """Move all objects tracked by garbage collector to the permanent
+    generation, so collections in forked children don't write to their
+    memory pages. Returns number of objects frozen."""
+
+    if not hasattr(gc, 'freeze'):  # Python < 3.7
+        return 0
+    gc.freeze()
+    return gc.get_freeze_count()
@@ -0,0 +1,204 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import re
+import threading
+
+from .exceptions import InterpolationError
+
+
+__all__ = ('Interpolator',)
+
+
+# ${NAME} or ${NAME:-default}, where default is a literal text
+_REFERENCE = re.compile(
+    r'\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}')
+
+
+def parse(value):
+    """Split value into literal text and (name, default) references
+
+    Returns tuple of parts and tuple of referenced names.
+    """
+
+    if '${' not in value:
+        return (value,), ()
+
+    parts = []
+    names = []
+    position = 0
+    for match in _REFERENCE.finditer(value):
+        if match.start() > position:
+            parts.append(value[position:match.start()])
+        parts.append((match.group(1), match.group(2)))
+        names.append(match.group(1))
+        position = match.end()
+    if position < len(value):
+        parts.append(value[position:])
+    return tuple(parts), tuple(names)
+
+
+class Interpolator(object):
+    """Expands ${NAME} and ${NAME:-default} references in raw values
+
+    Like in shell, unset (or empty) variable is replaced with default,
+    or with an empty string. Expanded values are memoized together with
+    their raw values, and a graph of references between variables is
+    kept to forget expanded values of all dependents of a variable when
+    it's changed (see invalidate()).
+    """
+
+    def __init__(self, getters):
+        self._getters = tuple(getters)
+        # name -> (raw value, expanded value)
+        self._expanded = {}
+        # name -> names of variables which reference it
+        self._dependents = {}
+        # name -> names of variables which it references
+        self._references = {}
+        # Number of invalidations, to not memoize values expanded while
+        # some variable was changed
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, name):
+        """Return raw value of variable, or None if it's not set"""
+
+        for get in self._getters:
+            value = get(name, None)
+            if value is not None:
+                return value
+        return None
+
+    def get(self, name, default=None):
+        """Return expanded value of variable, or default if it's not set"""
+
+        raw = self.lookup(name)
+        if raw is None:
+            return default
+
+        entry = self._expanded.get(name)
+        if entry is not None and entry[0] == raw:
+            return entry[1]
+        return self._expand(name, raw)
+
+    def _fresh(self, name, values):
+        """Return raw value of variable if it must be expanded, or None
+        if it's not set or its expanded value is still valid (then it's
+        added to values)"""
+
+        raw = self.lookup(name)
+        if raw is None:
+            self._expanded.pop(name, None)
+            return None
+        entry = self._expanded.get(name)
+        if entry is not None and entry[0] == raw:
+            values[name] = entry[1]
+            return None
+        return raw
+
+    def _expand(self, name, raw):
+        """Expand variable and all variables it depends on, visiting each
+        of them once (depth-first, without recursion)
+
+        Expanded values are memoized only if no variable was invalidated
+        meanwhile, as they could be built from its previous value.
+        """
+
+        version = self._version
+        values = {}
+        results = []
+        parts, names = parse(raw)
+        stack = [(name, raw, parts, iter(names))]
+        path = {name}
+
+        while stack:
+            current, raw, parts, references = stack[-1]
+            for reference in references:
+                if reference in path:
+                    cycle = [item[0] for item in stack]
+                    raise InterpolationError(
+                        cycle[cycle.index(reference):] + [reference])
+                reference_raw = self._fresh(reference, values)
+                if reference_raw is not None:
+                    reference_parts, reference_names = parse(reference_raw)
+                    stack.append((reference, reference_raw, reference_parts,
+                                  iter(reference_names)))
+                    path.add(reference)
+                    break
+            else:
+                stack.pop()
+                path.discard(current)
+                values[current] = self._join(parts, values)
+                results.append((current, raw, parts))
+
+        with self._lock:
+            if self._version == version:
+                for current, raw, parts in results:
+                    self._store(current, raw, values[current], parts)
+        return values[name]
+
+    @staticmethod
+    def _join(parts, values):
+        """Join expanded value from parts, with values of references"""
+
+        chunks = []
+        for part in parts:
+            if isinstance(part, tuple):
+                reference, default = part
+                value = values.get(reference, '')
+                if not value and default is not None:
+                    value = default
+                part = value
+            chunks.append(part)
+        return ''.join(chunks)
+
+    def _store(self, name, raw, value, parts):
+        """Memoize expanded value and update the graph of references"""
+
+        self._expanded[name] = (raw, value)
+        references = set(part[0] for part in parts
+                         if isinstance(part, tuple))
+
+        for reference in self._references.pop(name, ()):
+            self._dependents[reference].discard(name)
+        if references:
+            self._references[name] = references
+            for reference in references:
+                self._dependents.setdefault(reference, set()).add(name)
+
+    def invalidate(self, name):
+        """Forget expanded values of variable and all its dependents"""
+
+        with self._lock:
+            self._version += 1
+            pending = [name]
+            seen = {name}
+            while pending:
+                current = pending.pop()
+                self._expanded.pop(current, None)
+                for dependent in self._dependents.get(current, ()):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        pending.append(dependent)
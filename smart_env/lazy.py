@@ -0,0 +1,94 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+import sys
+
+import six
+
+
+__all__ = ('LazySettings',)
+
+
+class LazySettings(object):
+    """Module settings read from environment on first access
+
+    It installs module-level __getattr__() and __dir__() (PEP 562),
+    so it requires Python 3.7+: RuntimeError is raised on older versions,
+    which ignore them.
+    Once a setting is read, it's stored in module globals, so next
+    accesses are ordinary global lookups.
+    """
+
+    def __init__(self, env, module_name, schema):
+        if sys.version_info < (3, 7):
+            raise RuntimeError(
+                "Lazy settings modules require Python 3.7+ (PEP 562)")
+        self._env = env
+        self._module = sys.modules[module_name]
+
+        if isinstance(schema, dict):
+            self._schema = OrderedDict(six.iteritems(schema))
+        else:
+            self._schema = OrderedDict((name, name) for name in schema)
+
+        module_dict = self._module.__dict__
+        self._fallback = module_dict.get('__getattr__')
+        module_dict['__getattr__'] = self.__getattr
+        module_dict['__dir__'] = self.__dir
+
+    @property
+    def names(self):
+        """Names of settings in the module"""
+        return list(self._schema)
+
+    def __getattr(self, name):
+        try:
+            variable = self._schema[name]
+        except KeyError:
+            if self._fallback is not None:
+                return self._fallback(name)
+            raise AttributeError("module '{}' has no attribute '{}'".format(
+                self._module.__name__, name))
+
+        value = self._env.get(variable)
+        setattr(self._module, name, value)
+        return value
+
+    def __dir(self):
+        return sorted(set(self._module.__dict__) | set(self._schema))
+
+    def preload(self, names=None):
+        """Read settings which were not accessed yet at once
+
+        Useful for latency-sensitive code paths, which should not
+        pay for decoding on first access.
+        """
+
+        module_dict = self._module.__dict__
+        names = [name for name in (names or self._schema)
+                 if name not in module_dict]
+        values = self._env.get_many(self._schema[name] for name in names)
+        for name in names:
+            setattr(self._module, name, values[self._schema[name]])
@@ -0,0 +1,95 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+
+from .decoders import decode_value
+
+
+__all__ = ('decode_all', 'DEFAULT_THRESHOLD')
+
+
+# Values shorter than this are decoded in the calling process, as sending
+# them to a worker and pickling the result back costs more than decoding.
+# See "parallel_decode" benchmark for the crossover point on your machine.
+DEFAULT_THRESHOLD = 256 * 1024
+
+
+def _unknown(value):
+    raise KeyError(value)
+
+
+def _as_is(value, decoded):
+    return decoded
+
+
+def decode_all(values, workers=None, threshold=DEFAULT_THRESHOLD,
+               decode=decode_value, known=_unknown, finish=_as_is):
+    """Decode many raw values, sending large ones to a process pool
+
+    values is a mapping of name to raw value. Small values are decoded
+    with decode() in the calling process while the pool is busy with
+    large ones. Large values for which known() returns a decoded value
+    (instead of raising KeyError) are not sent to the pool, and values
+    decoded by the pool are passed through finish(raw, decoded), so
+    the caller can cache them. With workers=1 (or less than two large
+    values to decode) everything is decoded serially.
+
+    Returns OrderedDict of name to decoded value.
+    """
+
+    # Imported here, so importing smart_env doesn't load multiprocessing
+    import multiprocessing
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    decoded = {}
+    large = []
+    for name, value in values.items():
+        if len(value) >= threshold:
+            try:
+                decoded[name] = known(value)
+            except KeyError:
+                large.append(name)
+
+    if workers > 1 and len(large) > 1:
+        pool = multiprocessing.Pool(min(workers, len(large)))
+        try:
+            pending = pool.map_async(decode_value,
+                                     [values[name] for name in large],
+                                     chunksize=1)
+            for name, value in values.items():
+                if len(value) < threshold:
+                    decoded[name] = decode(value)
+            for name, item in zip(large, pending.get()):
+                decoded[name] = finish(values[name], item)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for name, value in values.items():
+            decoded[name] = decode(value)
+
+    return OrderedDict((name, decoded[name]) for name in values)
@@ -0,0 +1,130 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import re
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+
+__all__ = ('CompiledPath', 'compile_path')
+
+
+WILDCARD = '*'
+
+_INDEX = re.compile(r'^-?\d+$')
+
+_MISSING = object()
+
+# Compiled paths by expression; cleared when it grows over the limit
+_COMPILED = {}
+_MAX_COMPILED = 1024
+
+
+def _child(node, key, index):
+    """Return child of dict or list node, or _MISSING"""
+
+    if isinstance(node, Mapping):
+        return node.get(key, _MISSING)
+    if index is not None and isinstance(node, (list, tuple)):
+        try:
+            return node[index]
+        except IndexError:
+            pass
+    return _MISSING
+
+
+def _children(node):
+    if isinstance(node, Mapping):
+        return list(node.values())
+    if isinstance(node, (list, tuple)):
+        return list(node)
+    return []
+
+
+class CompiledPath(object):
+    """Dotted path into decoded value of a variable
+
+    Path "NAME.key.0.*.host" selects key "key" of a dict (or item
+    of a list, for numeric segments), its first item, and then "host"
+    of all its children: wildcard makes result a list of all values
+    found.
+    """
+
+    def __init__(self, expression):
+        segments = expression.split('.')
+        if not all(segments):
+            raise ValueError("Invalid path: {!r}".format(expression))
+
+        self.expression = expression
+        self.name = segments[0]
+        self.steps = tuple(
+            (segment, int(segment) if _INDEX.match(segment) else None)
+            for segment in segments[1:])
+        self.get = self._select if any(key == WILDCARD
+                                       for key, _ in self.steps) \
+            else self._get
+
+    def _get(self, document, default=None):
+        """Return value at path in document, or default"""
+
+        node = document
+        for key, index in self.steps:
+            node = _child(node, key, index)
+            if node is _MISSING:
+                return default
+        return node
+
+    def _select(self, document, default=None):
+        """Return list of values at path with wildcards in document"""
+
+        nodes = [document]
+        for key, index in self.steps:
+            if key == WILDCARD:
+                nodes = [child for node in nodes for child in _children(node)]
+            else:
+                nodes = [child for child in (_child(node, key, index)
+                                             for node in nodes)
+                         if child is not _MISSING]
+        return nodes
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.expression)
+
+
+def compile_path(expression):
+    """Return CompiledPath for expression, parsing it only once"""
+
+    try:
+        return _COMPILED[expression]
+    except KeyError:
+        pass
+
+    compiled = CompiledPath(expression)
+    if len(_COMPILED) >= _MAX_COMPILED:
+        _COMPILED.clear()
+    _COMPILED[expression] = compiled
+    return compiled
@@ -0,0 +1,88 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import io
+import json
+
+import six
+
+from .decoders import decode_values
+from .decoders import detect_decoder
+
+
+__all__ = ('build_manifest', 'load_manifest', 'save_manifest',
+           'decode_manifest')
+
+
+MANIFEST_VERSION = 1
+
+
+def build_manifest(values):
+    """Build manifest from (name, raw value) pairs of read variables,
+    remembering decoder which succeeded for each value"""
+
+    variables = []
+    for name, value in values:
+        decoder = None
+        if value is not None:
+            decoder = detect_decoder(value)[0]
+        variables.append({
+            'name': name,
+            'decoder': decoder.__name__ if decoder is not None else None,
+        })
+    return {'version': MANIFEST_VERSION, 'variables': variables}
+
+
+def save_manifest(manifest, path):
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(six.text_type(json.dumps(manifest, indent=2)))
+
+
+def load_manifest(path):
+    with io.open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(
+            "Unsupported manifest version: {}".format(manifest.get('version')))
+    return manifest
+
+
+def decode_manifest(manifest, lookup):
+    """Read and decode variables listed in manifest
+
+    Values are decoded in batches with decode_values(). Decoders recorded
+    in the manifest are not trusted: a value changed since it was
+    recorded may be decoded by a decoder which comes earlier in the chain
+    now, so each value goes through the chain in its order, like it does
+    when variable is read.
+
+    Returns dict of raw value to decoded one.
+    """
+
+    values = []
+    for variable in manifest['variables']:
+        value = lookup(variable['name'])
+        if value is not None:
+            values.append(value)
+    return dict(zip(values, decode_values(values)))
@@ -0,0 +1,212 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+from .exceptions import EncodeError
+
+
+__all__ = ('SharedConfig', 'publish', 'SHARED_PATH_VARIABLE')
+
+
+# Environment variable used to hand the segment path over to workers
+SHARED_PATH_VARIABLE = 'SMART_ENV_SHARED'
+
+MAGIC = b'SMARTENV'
+
+# magic, version, size of the marshalled index
+HEADER = struct.Struct('<8sQQ')
+
+
+def default_path():
+    """Build a path for a new segment, preferring memory-backed /dev/shm"""
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') \
+        else tempfile.gettempdir()
+    return os.path.join(directory, 'smart_env.{}'.format(os.getpid()))
+
+
+def _read_version(path):
+    """Read version of already published segment, or 0 if there is none"""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+    except (IOError, OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+def publish(values, path):
+    """Serialize decoded values into a read-only segment at given path
+
+    Every value is marshalled separately, so readers can load only
+    the values they actually use. The segment is written into a temporary
+    file first and then atomically renamed, so attached readers keep
+    seeing a consistent previous version until they refresh.
+
+    Returns version of published segment.
+    """
+
+    version = _read_version(path) + 1
+
+    index = {}
+    chunks = []
+    offset = 0
+    for name, value in values.items():
+        try:
+            chunk = marshal.dumps(value)
+        except ValueError:
+            raise EncodeError(
+                "Value of '{}' cannot be shared".format(name))
+        index[name] = (offset, len(chunk))
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    index_chunk = marshal.dumps(index)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or None,
+                                    prefix='.smart_env.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, version, len(index_chunk)))
+            f.write(index_chunk)
+            for chunk in chunks:
+                f.write(chunk)
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    return version
+
+
+class SharedConfig(Mapping):
+    """Read-only mapping of values published by the master process
+
+    Values are stored in a memory-mapped segment and unmarshalled lazily
+    on first access. Use raw() for zero-copy access to the serialized data.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._attach()
+
+    def _attach(self):
+        """Map the segment, replacing current one only if it succeeds"""
+        with open(self._path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_size = HEADER.unpack_from(segment, 0)
+        if magic != MAGIC:
+            segment.close()
+            raise ValueError(
+                "'{}' is not a shared config segment".format(self._path))
+
+        buffer = memoryview(segment)
+        base = HEADER.size + index_size
+        index = marshal.loads(buffer[HEADER.size:base])
+
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._mmap = segment
+        self._buffer = buffer
+        self._base = base
+        self._index = index
+        self._values = {}
+        self.version = version
+
+    @staticmethod
+    def _detach(segment, buffer):
+        buffer.release()
+        try:
+            segment.close()
+        except BufferError:
+            # Views returned by raw() are still used, the segment is
+            # unmapped once they are released
+            pass
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def stale(self):
+        """Check if master has republished (or removed) the segment"""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self._identity
+
+    def refresh(self):
+        """Attach to the latest published version if current one is stale
+
+        Returns True if a new version was attached.
+        """
+        if not self.stale:
+            return False
+        segment, buffer = self._mmap, self._buffer
+        self._attach()
+        self._detach(segment, buffer)
+        return True
+
+    def close(self):
+        """Detach from the segment"""
+        self._values = {}
+        self._detach(self._mmap, self._buffer)
+
+    def raw(self, name):
+        """Return marshalled value as a memoryview into the segment
+
+        The view keeps the version it was taken from mapped until it's
+        released, even after refresh() or close().
+        """
+        offset, size = self._index[name]
+        start = self._base + offset
+        return self._buffer[start:start + size]
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            value = self._values[name] = marshal.loads(self.raw(name))
+            return value
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
@@ -0,0 +1,124 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import io
+import os
+import stat
+import time
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+
+__all__ = ('SecretsDirectory',)
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class _Entry(object):
+    """Cached content of a single secret file"""
+
+    __slots__ = ('identity', 'value', 'checked')
+
+    def __init__(self, identity, value, checked):
+        self.identity = identity
+        self.value = value
+        self.checked = checked
+
+
+class SecretsDirectory(Mapping):
+    """Read-only source of variables stored as one file per name,
+    like Docker and Kubernetes secrets mounted under /run/secrets
+
+    File contents are cached and revalidated with stat() (inode, size
+    and mtime) not more often than once per min_interval seconds,
+    so unchanged files are never reread. As stat() follows symlinks,
+    an atomic swap of the "..data" symlink made by Kubernetes is picked
+    up on the next revalidation.
+    """
+
+    def __init__(self, path, min_interval=1.0, encoding='utf-8'):
+        self.path = path
+        self.min_interval = min_interval
+        self.encoding = encoding
+        self._entries = {}
+
+    def _read(self, path):
+        with io.open(path, encoding=self.encoding,
+                     errors='surrogateescape') as f:
+            return f.read()
+
+    def __getitem__(self, name):
+        now = _clock()
+        entry = self._entries.get(name)
+
+        if entry is None or now - entry.checked >= self.min_interval:
+            entry = self._revalidate(name, entry, now)
+
+        if entry.value is None:
+            raise KeyError(name)
+        return entry.value
+
+    def _revalidate(self, name, entry, now):
+        identity = value = None
+
+        # Names are not allowed to point outside of the directory
+        if name and os.sep not in name and not name.startswith('.'):
+            path = os.path.join(self.path, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                info = None
+
+            if info is not None and stat.S_ISREG(info.st_mode):
+                identity = (info.st_dev, info.st_ino,
+                            info.st_size, info.st_mtime)
+                if entry is not None and entry.identity == identity:
+                    value = entry.value
+                else:
+                    try:
+                        value = self._read(path)
+                    except (IOError, OSError):
+                        identity = None
+
+        entry = self._entries[name] = _Entry(identity, value, now)
+        return entry
+
+    def _names(self):
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return []
+        # Kubernetes keeps real files in hidden "..<timestamp>" directories
+        return [name for name in names if not name.startswith('.') and
+                os.path.isfile(os.path.join(self.path, name))]
+
+    def __iter__(self):
+        return iter(self._names())
+
+    def __len__(self):
+        return len(self._names())
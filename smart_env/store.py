@@ -0,0 +1,127 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+import sys
+
+import six
+from six.moves import intern
+
+
+__all__ = ('CompactStore', 'deep_sizeof')
+
+
+def deep_sizeof(*objects):
+    """Return total size of objects and everything they contain,
+    counting each shared object only once"""
+
+    seen = set()
+    stack = list(objects)
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(six.iterkeys(obj))
+            stack.extend(six.itervalues(obj))
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
+
+
+class CompactStore(object):
+    """Store of decoded values optimized for memory usage
+
+    - identical raw values share one decoded object
+    - dict keys and strings up to max_string_length are interned,
+      so they are shared between all decoded values
+    - lists are optionally stored as tuples, which are smaller
+
+    At most max_entries values are kept, least recently used ones are
+    dropped first, so values of variables which change often don't
+    accumulate. As values are shared, they must not be modified by
+    callers.
+    """
+
+    def __init__(self, lists_as_tuples=False, max_string_length=64,
+                 max_entries=1024):
+        self.lists_as_tuples = lists_as_tuples
+        self.max_string_length = max_string_length
+        self.max_entries = max_entries
+        self._values = OrderedDict()
+
+    def get(self, raw):
+        """Return decoded value stored for raw one, or raise KeyError"""
+        values = self._values
+        value = values.pop(raw)
+        values[raw] = value
+        return value
+
+    def add(self, raw, decoded):
+        """Store compacted decoded value and return it"""
+        values = self._values
+        value = values[raw] = self.compact(decoded)
+        while len(values) > self.max_entries:
+            try:
+                values.popitem(last=False)
+            except KeyError:  # Emptied by another thread
+                break
+        return value
+
+    @property
+    def entries(self):
+        """Number of stored values"""
+        return len(self._values)
+
+    def compact(self, value):
+        """Return compacted copy of value"""
+
+        if isinstance(value, str):
+            if len(value) <= self.max_string_length:
+                return intern(value)
+            return value
+        if isinstance(value, dict):
+            return dict((intern(key) if isinstance(key, str)
+                         else self.compact(key), self.compact(item))
+                        for key, item in six.iteritems(value))
+        if isinstance(value, list):
+            items = [self.compact(item) for item in value]
+            return tuple(items) if self.lists_as_tuples else items
+        if isinstance(value, tuple):
+            return tuple(self.compact(item) for item in value)
+        if isinstance(value, frozenset):
+            return frozenset(self.compact(item) for item in value)
+        if isinstance(value, set):
+            return set(self.compact(item) for item in value)
+        return value
+
+    def memory_usage(self):
+        """Return size of stored values in bytes (see deep_sizeof())"""
+        return deep_sizeof(*six.itervalues(self._values))
+
+    def clear(self):
+        self._values = OrderedDict()
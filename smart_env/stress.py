@@ -0,0 +1,245 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# Stress test of concurrent reads and writes of variables. Run it with:
+#
+#     python -m smart_env.stress --threads 64 --processes 4
+#
+# Each thread makes a fixed, seeded sequence of operations on pairs of
+# variables: writes set both variables of a pair to the same token with
+# Env.update(), and reads check that both variables are equal. Results
+# are printed as JSON, which can be compared across versions.
+
+from collections import OrderedDict
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import threading
+import timeit
+
+from .env import Env
+
+
+__all__ = ('run_stress', 'main')
+
+
+READ_MODES = ('consistent', 'get')
+
+
+def percentile(values, percent):
+    """Return percentile of sorted values (nearest rank)"""
+
+    if not values:
+        return None
+    return values[int(round(percent / 100.0 * (len(values) - 1)))]
+
+
+def _names(keys, prefix):
+    return [('{}{}_A'.format(prefix, i), '{}{}_B'.format(prefix, i))
+            for i in range(keys)]
+
+
+def _run_thread(env, names, config, seed, start, stats):
+    """Make operations of a single thread, appending latencies of reads
+    and writes and counts of errors and inconsistencies to stats"""
+
+    rng = random.Random(seed)
+    timer = timeit.default_timer
+    reads, writes = [], []
+    errors = inconsistencies = 0
+    consistent = config['read_mode'] == 'consistent'
+
+    start.wait()
+    for i in range(config['operations']):
+        first, second = names[rng.randrange(len(names))]
+        began = timer()
+        try:
+            if rng.random() < config['write_ratio']:
+                token = '{}-{}'.format(seed, i)
+                env.update(((first, token), (second, token)))
+                writes.append(timer() - began)
+            else:
+                if consistent:
+                    with env.consistent() as view:
+                        values = view.get(first), view.get(second)
+                else:
+                    values = env.get(first), env.get(second)
+                reads.append(timer() - began)
+                if values[0] != values[1]:
+                    inconsistencies += 1
+        except Exception:
+            errors += 1
+
+    with stats['lock']:
+        stats['reads'].extend(reads)
+        stats['writes'].extend(writes)
+        stats['errors'] += errors
+        stats['inconsistencies'] += inconsistencies
+
+
+def _run_process(args):
+    """Run all threads of a single process against a new Env
+    of the process environment; args are config and process number"""
+
+    config, process = args
+    env = Env()
+    names = _names(config['keys'], config['prefix'])
+    env.update((name, '0') for pair in names for name in pair)
+
+    stats = {'lock': threading.Lock(), 'reads': [], 'writes': [],
+             'errors': 0, 'inconsistencies': 0}
+    start = threading.Event()
+    threads = [
+        threading.Thread(target=_run_thread, args=(
+            env, names, config,
+            config['seed'] + process * config['threads'] + i, start, stats))
+        for i in range(config['threads'])
+    ]
+    for thread in threads:
+        thread.start()
+    began = timeit.default_timer()
+    start.set()
+    for thread in threads:
+        thread.join()
+    seconds = timeit.default_timer() - began
+
+    env.update((name, None) for pair in names for name in pair)
+    del stats['lock']
+    stats['seconds'] = seconds
+    return stats
+
+
+def _latency(values):
+    values.sort()
+    return OrderedDict([
+        ('count', len(values)),
+        ('p50', percentile(values, 50)),
+        ('p99', percentile(values, 99)),
+        ('max', values[-1] if values else None),
+    ])
+
+
+def run_stress(threads=4, processes=1, keys=100, write_ratio=0.1,
+               operations=10000, read_mode='consistent', seed=0,
+               prefix='SMART_ENV_STRESS_'):
+    """Run stress test and return its results
+
+    Each of threads in each of processes makes given number of
+    operations on keys pairs of variables, and write_ratio of them
+    are writes. Reads use Env.consistent() or Env.get() (read_mode).
+
+    Returns OrderedDict with configuration, platform, throughput
+    (operations per second), latencies of reads and writes (seconds),
+    and counts of errors and inconsistent reads.
+    """
+
+    if read_mode not in READ_MODES:
+        raise ValueError("Unknown read mode: {}".format(read_mode))
+
+    config = OrderedDict([
+        ('threads', threads),
+        ('processes', processes),
+        ('keys', keys),
+        ('write_ratio', write_ratio),
+        ('operations', operations),
+        ('read_mode', read_mode),
+        ('seed', seed),
+        ('prefix', prefix),
+    ])
+
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_run_process, [(config, process)
+                                              for process in range(processes)])
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_run_process((config, 0))]
+
+    reads = [value for result in results for value in result['reads']]
+    writes = [value for result in results for value in result['writes']]
+    seconds = max(result['seconds'] for result in results)
+    total = len(reads) + len(writes)
+
+    return OrderedDict([
+        ('config', config),
+        ('platform', OrderedDict([
+            ('python', platform.python_version()),
+            ('implementation', platform.python_implementation()),
+            ('system', platform.system()),
+            ('cpus', multiprocessing.cpu_count()),
+        ])),
+        ('seconds', seconds),
+        ('throughput', total / seconds if seconds else None),
+        ('reads', _latency(reads)),
+        ('writes', _latency(writes)),
+        ('errors', sum(result['errors'] for result in results)),
+        ('inconsistencies', sum(result['inconsistencies']
+                                for result in results)),
+    ])
+
+
+def build_parser(parser=None):
+    """Add stress test options to parser (a new one by default)"""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(
+            prog='python -m smart_env.stress',
+            description='Stress test of concurrent reads and writes')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='threads per process (default: %(default)s)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='processes (default: %(default)s)')
+    parser.add_argument('--keys', type=int, default=100,
+                        help='pairs of variables (default: %(default)s)')
+    parser.add_argument('--write-ratio', type=float, default=0.1,
+                        help='share of writes (default: %(default)s)')
+    parser.add_argument('--operations', type=int, default=10000,
+                        help='operations per thread (default: %(default)s)')
+    parser.add_argument('--read-mode', choices=READ_MODES,
+                        default='consistent',
+                        help='how pairs are read (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+
+def run_from_args(args, stdout=None):
+    results = run_stress(args.threads, args.processes, args.keys,
+                         args.write_ratio, args.operations, args.read_mode,
+                         args.seed)
+    (stdout or sys.stdout).write(json.dumps(results, indent=2) + '\n')
+    return 1 if results['errors'] else 0
+
+
+def main(argv=None):
+    return run_from_args(build_parser().parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
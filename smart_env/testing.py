@@ -0,0 +1,84 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import contextlib
+
+from .env import ENV
+
+
+__all__ = ('EnvIsolationMixin', 'isolated_env', 'pytest_fixture')
+
+
+@contextlib.contextmanager
+def isolated_env(env=ENV):
+    """Undo all changes made through env inside the block
+
+        with isolated_env():
+            ENV.DEBUG = True
+            ...
+    """
+
+    token = env.checkpoint()
+    try:
+        yield env
+    finally:
+        env.restore(token)
+
+
+class EnvIsolationMixin(object):
+    """unittest.TestCase mixin undoing changes made through env
+    by each test
+
+        class MyTestCase(EnvIsolationMixin, unittest.TestCase):
+            ...
+
+    Test cases which define setUp() must call it of the super class
+    before changing variables.
+    """
+
+    env = ENV
+
+    def setUp(self):
+        super(EnvIsolationMixin, self).setUp()
+        self.addCleanup(self.env.restore, self.env.checkpoint())
+
+
+def pytest_fixture(env=ENV, name='env'):
+    """Create pytest fixture providing env and undoing changes made
+    through it by each test. Put into conftest.py (importing the module,
+    as pytest takes functions named pytest_* there for hooks):
+
+        from smart_env import testing
+
+        env = testing.pytest_fixture()
+    """
+
+    import pytest
+
+    @pytest.fixture(name=name)
+    def fixture():
+        with isolated_env(env):
+            yield env
+
+    return fixture
@@ -0,0 +1,64 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+__all__ = ('build_tree',)
+
+
+def _convert(node):
+    """Turn trie nodes into dicts, or lists if all their keys are
+    numbers, in place of children"""
+
+    for key, child in node.items():
+        if isinstance(child, _Node):
+            node[key] = _convert(child)
+    if node and all(key.isdigit() for key in node):
+        return [node[key] for key in sorted(node, key=int)]
+    return dict(node)
+
+
+class _Node(dict):
+    """Inner node of a trie, to tell it from decoded dict values"""
+
+
+def build_tree(items, sep):
+    """Build nested structure from (name, value) pairs in one pass
+
+    Names are split by sep into keys of nested dicts, where dicts
+    with numeric keys only become lists ordered by them. If a name is
+    a prefix of other names (like "DB" and "DB__HOST"), the nested
+    values win.
+    """
+
+    root = _Node()
+    for name, value in items:
+        keys = name.split(sep)
+        node = root
+        for key in keys[:-1]:
+            child = node.get(key)
+            if not isinstance(child, _Node):
+                child = node[key] = _Node()
+            node = child
+        if not isinstance(node.get(keys[-1]), _Node):
+            node[keys[-1]] = value
+    return _convert(root)
@@ -0,0 +1,166 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import unittest
+
+from smart_env import ENV
+from smart_env import Env
+from smart_env import FrozenBackend
+from smart_env.backends import EnvironMirror
+
+
+__all__ = ('EnvBackendTestCase', 'EnvironMirrorTestCase')
+
+
+class EnvBackendTestCase(unittest.TestCase):
+    """Test cases for Env instances with different backends"""
+
+    def test_001_default_instance(self):
+        """Check that ENV is an Env instance backed by os.environ"""
+
+        self.assertIsInstance(ENV, Env)
+        self.assertIs(ENV.backend, os.environ)
+
+    def test_002_dict_backend(self):
+        """Check reading and writing variables of dict backend"""
+
+        backend = {'COUNT': '10'}
+        env = Env(backend)
+
+        self.assertEqual(env.COUNT, '10')
+        self.assertIsNone(env.MISSING)
+        self.assertIn('COUNT', env)
+
+        env.enable_automatic_type_cast()
+        self.assertEqual(env.COUNT, 10)
+
+        env.FLAGS = ['a', 'b']
+        self.assertEqual(backend['FLAGS'], '["a", "b"]')
+        self.assertEqual(env.FLAGS, ['a', 'b'])
+        self.assertEqual(list(env), ['COUNT', 'FLAGS'])
+        self.assertEqual(len(env), 2)
+
+        del env.COUNT
+        env.FLAGS = None
+        self.assertEqual(backend, {})
+        self.assertNotIn('FLAGS', os.environ)
+
+    def test_003_frozen_backend(self):
+        """Check that frozen backend is read-only"""
+
+        env = Env(FrozenBackend({'NAME': 'value'}))
+
+        self.assertEqual(env.NAME, 'value')
+        self.assertEqual(dict(env.items()), {'NAME': 'value'})
+
+        with self.assertRaises(TypeError):
+            env.NAME = 'other'
+        with self.assertRaises(TypeError):
+            del env.NAME
+
+    def test_004_independent_settings(self):
+        """Check that instances have their own settings"""
+
+        ENV.disable_automatic_type_cast()
+        env = Env({})
+        env.enable_automatic_type_cast()
+
+        self.assertTrue(env.is_auto_type_cast())
+        self.assertFalse(ENV.is_auto_type_cast())
+
+
+class EnvironMirrorTestCase(unittest.TestCase):
+    """Test cases for str-keyed mirror of os.environ"""
+
+    KEY = 'MIRROR_VAR'
+
+    def tearDown(self):
+        os.environ.pop(self.KEY, None)
+
+    def test_001_write_through(self):
+        """Check that writes go to both mirror and os.environ"""
+
+        mirror = EnvironMirror()
+        mirror[self.KEY] = 'value'
+        self.assertEqual(os.environ[self.KEY], 'value')
+        self.assertEqual(mirror[self.KEY], 'value')
+
+        del mirror[self.KEY]
+        self.assertNotIn(self.KEY, os.environ)
+        self.assertNotIn(self.KEY, mirror)
+        with self.assertRaises(KeyError):
+            del mirror[self.KEY]
+
+    def test_002_external_changes(self):
+        """Check that added or removed variables are detected, and other
+        changes are applied by resync()"""
+
+        mirror = EnvironMirror()
+        os.environ[self.KEY] = 'value'
+        self.assertEqual(mirror.get(self.KEY), 'value')
+        self.assertEqual(len(mirror), len(os.environ))
+
+        del os.environ[self.KEY]
+        self.assertNotIn(self.KEY, list(mirror))
+
+        os.environ[self.KEY] = 'value'
+        mirror.resync()
+        os.environ[self.KEY] = 'other'
+        self.assertEqual(mirror[self.KEY], 'value')
+        mirror.resync()
+        self.assertEqual(mirror[self.KEY], 'other')
+
+        other = self.KEY + '_OTHER'
+        self.addCleanup(os.environ.pop, other, None)
+        del os.environ[self.KEY]
+        os.environ[other] = 'z'
+        mirror.resync()
+        self.assertNotIn(self.KEY, mirror)
+        self.assertEqual(mirror[other], 'z')
+
+        # os.environ itself is left as it is
+        self.assertIs(type(os.environ._data), dict)
+
+    def test_003_env_fast_lookup(self):
+        """Check switching Env to mirror and back"""
+
+        env = Env()
+        env.enable_fast_lookup()
+        self.assertIsInstance(env.backend, EnvironMirror)
+
+        setattr(env, self.KEY, 'value')
+        self.assertEqual(os.environ[self.KEY], 'value')
+        self.assertEqual(getattr(env, self.KEY), 'value')
+        self.assertIn(self.KEY, env)
+
+        delattr(env, self.KEY)
+        self.assertNotIn(self.KEY, env)
+        self.assertIsNone(getattr(env, self.KEY))
+
+        # Variables found in the mirror are a single dict lookup
+        self.assertIs(env._getters[0].__self__, env.backend._data)
+
+        env.disable_fast_lookup()
+        self.assertIs(env.backend, os.environ)
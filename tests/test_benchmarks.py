@@ -0,0 +1,65 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import numbers
+import sys
+import unittest
+
+from smart_env.benchmarks import BENCHMARKS
+from smart_env.benchmarks import run
+
+
+__all__ = ('BenchmarksTestCase',)
+
+
+# Scales which keep each benchmark short, but still measuring something
+SCALES = {
+    'consistent_reads': 0.01,
+    'decode_budget': 0.0001,
+    'decode_cache': 0.01,
+    'decode_many': 0.01,
+    'compact_store': 0.01,
+    'external': 0.01,
+    'fork_memory': 0.01,
+    'prefetch': 0.01,
+    'tree': 0.01,
+}
+
+
+class BenchmarksTestCase(unittest.TestCase):
+    """Smoke test for all registered benchmarks"""
+
+    def test_001_registered_benchmarks(self):
+        """Check that each benchmark runs and reports measurements"""
+
+        for name in BENCHMARKS:
+            with self.subTest(benchmark=name):
+                results = run([name], scale=SCALES.get(name, 0.001))[name]
+                # Some benchmarks measure only what Linux provides
+                if sys.platform.startswith('linux'):
+                    self.assertTrue(results)
+                for case, value in results.items():
+                    self.assertIsInstance(case, str)
+                    self.assertIsInstance(value, numbers.Real)
+                    self.assertGreaterEqual(value, 0)
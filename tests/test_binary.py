@@ -0,0 +1,114 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import unittest
+
+from smart_env import Env
+from smart_env.binary import ENVIRONB
+from smart_env.decoders import BooleanDecoder
+from smart_env.decoders import CollectionDecoder
+from smart_env.decoders import JSONDecoder
+from smart_env.decoders import decode_value
+from smart_env.exceptions import DecodeError
+
+
+__all__ = ('BytesDecodeTestCase', 'BytesEnvTestCase')
+
+
+class BytesDecodeTestCase(unittest.TestCase):
+    """Test cases for decoding bytes values"""
+
+    def test_001_decoders(self):
+        """Check that decoders accept bytes"""
+
+        self.assertEqual(JSONDecoder.decode(b'{"a": "\xc3\xa9"}'),
+                         {'a': u'\xe9'})
+        self.assertIs(BooleanDecoder.decode(b'True'), True)
+        self.assertEqual(CollectionDecoder.decode(b"('a', 1)"), ('a', 1))
+
+        for decoder in (JSONDecoder, BooleanDecoder, CollectionDecoder):
+            with self.assertRaises(DecodeError):
+                decoder.decode(b'[1, \xff]')
+
+    def test_002_decode_value(self):
+        """Check that undecodable bytes are returned as they are"""
+
+        self.assertEqual(decode_value(b'[1, 2]'), [1, 2])
+        self.assertEqual(decode_value(b'\xff\x00text'), b'\xff\x00text')
+
+
+class BytesEnvTestCase(unittest.TestCase):
+    """Test cases for reading and writing variables as bytes"""
+
+    def setUp(self):
+        self.env = Env({'TEXT': u'caf\xe9', 'LIST': '[1, 2]'})
+
+    def tearDown(self):
+        os.environ.pop('SMART_ENV_BYTES', None)
+
+    def test_001_get_bytes(self):
+        """Check reading other backends as bytes"""
+
+        self.assertEqual(self.env.get_bytes('TEXT'), u'caf\xe9'.encode())
+        self.assertEqual(self.env.get_bytes('LIST', decode=True), [1, 2])
+        self.assertEqual(self.env.get_bytes('MISSING', b''), b'')
+
+        self.assertEqual(self.env.bytes.LIST, b'[1, 2]')
+        self.assertIsNone(self.env.bytes.MISSING)
+        self.assertIn('LIST', self.env.bytes)
+        with self.assertRaises(KeyError):
+            self.env.bytes['MISSING']
+
+    def test_002_set_bytes(self):
+        """Check writing bytes to other backends"""
+
+        self.env.bytes.LIST = b'[3]'
+        self.env.enable_automatic_type_cast()
+        self.assertEqual(self.env.LIST, [3])
+        with self.assertRaises(TypeError):
+            self.env.set_bytes('LIST', u'[4]')
+
+        del self.env.bytes.LIST
+        self.assertNotIn('LIST', self.env)
+
+    def test_003_decode_budget(self):
+        """Check that decode budget is applied to bytes"""
+
+        self.env.set_decode_budget(max_items=1, fallback=True)
+        self.assertEqual(self.env.get_bytes('LIST', decode=True),
+                         b'[1, 2]')
+
+    @unittest.skipIf(ENVIRONB is None, "os.environb is not available")
+    def test_004_environb(self):
+        """Check that non-UTF-8 values of os.environ are kept as is"""
+
+        value = b'\xff\xfe binary'
+        plain, mirrored = Env(), Env()
+        mirrored.enable_fast_lookup()
+        for env in (plain, mirrored):
+            env.bytes.SMART_ENV_BYTES = value
+            self.assertEqual(ENVIRONB[b'SMART_ENV_BYTES'], value)
+            self.assertEqual(env.get_bytes('SMART_ENV_BYTES'), value)
+            del env.bytes.SMART_ENV_BYTES
@@ -0,0 +1,114 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import timeit
+import unittest
+
+from smart_env import Env
+from smart_env.benchmarks import pathological_corpus
+from smart_env.budget import DecodeBudget
+from smart_env.exceptions import DecodeBudgetExceeded
+from smart_env.exceptions import DecodeError
+
+
+__all__ = ('DecodeBudgetTestCase',)
+
+
+class DecodeBudgetTestCase(unittest.TestCase):
+    """Test cases for limits of decoded values"""
+
+    def setUp(self):
+        self.backend = {
+            'SMALL': '{"a": [1, 2], "b": "[[[,,,]]]"}',
+            'DEEP': '[[[[1]]]]',
+            'WIDE': '[1, 2, 3, 4, 5, 6]',
+        }
+        self.env = Env(self.backend)
+        self.env.enable_automatic_type_cast()
+
+    def test_001_check(self):
+        """Check that limits are checked, ignoring quoted text"""
+
+        budget = DecodeBudget(max_length=40, max_depth=3, max_items=5)
+        budget.check(self.backend['SMALL'])
+        budget.check("'[[[[,,,,,,'")
+        budget.check('["a\\"[[[[", "\\\\", 1]')
+        budget.check('text, with, a lot, of, commas, in it')
+
+        for value, limit in (('[[[[1]]]]', 'depth'),
+                             ('[1, 2, 3, 4, 5, 6]', 'items'),
+                             ('"{}"'.format('x' * 40), 'length')):
+            with self.assertRaises(DecodeBudgetExceeded) as context:
+                budget.check(value)
+            self.assertEqual(context.exception.limit, limit)
+
+    def test_002_raise(self):
+        """Check that values exceeding budget are not decoded"""
+
+        self.env.set_decode_budget(max_depth=3, max_items=5)
+        self.assertEqual(self.env.SMALL, {'a': [1, 2], 'b': '[[[,,,]]]'})
+        with self.assertRaises(DecodeError):
+            self.env.DEEP
+        with self.assertRaises(DecodeBudgetExceeded):
+            self.env.get_many(['SMALL', 'WIDE'])
+
+        self.env.set_decode_budget()
+        self.assertEqual(self.env.DEEP, [[[[1]]]])
+
+    def test_003_fallback(self):
+        """Check that values exceeding budget can be returned raw"""
+
+        self.env.set_decode_budget(max_depth=3, max_items=5, fallback=True)
+        self.assertEqual(self.env.DEEP, '[[[[1]]]]')
+        self.assertEqual(self.env.get_many(['SMALL', 'WIDE'])['WIDE'],
+                         '[1, 2, 3, 4, 5, 6]')
+        self.assertEqual(self.env.decode_all(['DEEP', 'SMALL', 'MISSING']),
+                         {'DEEP': '[[[[1]]]]', 'MISSING': None,
+                          'SMALL': {'a': [1, 2], 'b': '[[[,,,]]]'}})
+
+    def test_004_pathological(self):
+        """Check that pathological values are rejected by budget"""
+
+        self.env = Env(pathological_corpus(100000))
+        self.env.enable_automatic_type_cast()
+        self.env.set_decode_budget(max_depth=32, max_items=10000)
+        for name in self.env:
+            with self.assertRaises(DecodeBudgetExceeded):
+                self.env[name]
+
+    def test_005_unterminated_quote(self):
+        """Check that values with escaped quotes are scanned in linear
+        time"""
+
+        budget = DecodeBudget(max_depth=32, max_items=10000)
+
+        def scan(size):
+            value = '[' + "'\\" * size
+            return min(timeit.repeat(lambda: budget.check(value),
+                                     repeat=3, number=1))
+
+        small, large = scan(16000), scan(256000)
+        # Quadratic scan takes minutes for the large value
+        self.assertLess(large, 5)
+        self.assertLess(large, small * 16 * 4)
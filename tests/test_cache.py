@@ -0,0 +1,129 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from smart_env import ENV
+from smart_env.cache import DecodeCache
+
+
+__all__ = ('DecodeCacheTestCase', 'EnvDecodeCacheTestCase')
+
+
+class DecodeCacheTestCase(unittest.TestCase):
+    """Test cases for persistent decode cache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DecodeCache(self.directory, min_length=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_001_get_and_set(self):
+        """Check that stored value can be read back"""
+
+        with self.assertRaises(KeyError):
+            self.cache.get('[1, 2, 3]')
+
+        self.cache.set('[1, 2, 3]', [1, 2, 3])
+        self.assertEqual(self.cache.get('[1, 2, 3]'), [1, 2, 3])
+
+    def test_002_short_values_are_skipped(self):
+        """Check that values shorter than min_length are not stored"""
+
+        self.cache.set('[1]', [1])
+        self.assertEqual(os.listdir(self.directory), [])
+        with self.assertRaises(KeyError):
+            self.cache.get('[1]')
+
+    def test_003_corrupted_entry(self):
+        """Check fallback when cache entry is corrupted"""
+
+        self.cache.set('[1, 2, 3]', [1, 2, 3])
+        path = os.path.join(self.directory, os.listdir(self.directory)[0])
+        with open(path, 'wb') as f:
+            f.write(b'\xff')
+
+        with self.assertRaises(KeyError):
+            self.cache.get('[1, 2, 3]')
+        self.assertFalse(os.path.exists(path))
+
+    def test_004_eviction(self):
+        """Check that cache size is bounded"""
+
+        cache = DecodeCache(self.directory, max_size=1024, min_length=0)
+        for i in range(100):
+            cache.set(str(i), 'x' * 100)
+
+        self.assertLessEqual(cache.size, 1024)
+        self.assertLessEqual(sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)), 1024)
+
+    def test_005_unserializable_value(self):
+        """Check that values which cannot be marshalled are skipped"""
+
+        self.cache.set('value', object())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_006_clear(self):
+        """Check clearing the cache"""
+
+        self.cache.set('[1, 2, 3]', [1, 2, 3])
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.cache.size, 0)
+
+
+class EnvDecodeCacheTestCase(unittest.TestCase):
+    """Test cases for decode cache usage in ENV"""
+
+    KEY = 'CACHED_VALUE'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        ENV.enable_automatic_type_cast()
+        ENV.enable_decode_cache(self.directory, min_length=0)
+
+    def tearDown(self):
+        ENV.disable_decode_cache()
+        ENV.disable_automatic_type_cast()
+        os.environ.pop(self.KEY, None)
+        shutil.rmtree(self.directory)
+
+    def test_001_decode_through_cache(self):
+        """Check that cached values are the same as decoded ones"""
+
+        for value, expected in (("{'a': [1, 2]}", {'a': [1, 2]}),
+                                ('true', True),
+                                ('plain text', 'plain text')):
+            os.environ[self.KEY] = value
+            self.assertEqual(getattr(ENV, self.KEY), expected)
+            self.assertEqual(getattr(ENV, self.KEY), expected)
+
+        self.assertEqual(len(os.listdir(self.directory)), 3)
@@ -0,0 +1,135 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+
+import six
+
+from smart_env.cli import main
+
+
+__all__ = ('CommandLineTestCase',)
+
+
+class CommandLineTestCase(unittest.TestCase):
+    """Test cases for python -m smart_env"""
+
+    def setUp(self):
+        self.environ = {
+            'APP_DEBUG': 'true',
+            'APP_HOSTS': "['a', 'b']",
+            'APP_NAME': "it's\nme",
+            'OTHER': '{"a": 1}',
+        }
+
+    def run_main(self, *argv):
+        stdout, stderr = six.StringIO(), six.StringIO()
+        code = main(list(argv), self.environ, stdout, stderr)
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_001_get(self):
+        """Check printing decoded values of many variables"""
+
+        self.assertEqual(self.run_main('get', 'APP_DEBUG', 'OTHER'),
+                         (0, 'true\n{"a": 1}\n', ''))
+
+        code, stdout, stderr = self.run_main('get', 'APP_HOSTS', 'MISSING',
+                                             '--format', 'json')
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(stdout),
+                         {'APP_HOSTS': ['a', 'b'], 'MISSING': None})
+        self.assertIn('MISSING', stderr)
+
+        self.assertEqual(self.run_main('get', 'APP_NAME', 'APP_DEBUG',
+                                       '-f', 'nul'),
+                         (0, "it's\nme\0true\0", ''))
+
+    def test_002_export(self):
+        """Check that exported values survive shell evaluation"""
+
+        self.environ['APP_BAD-NAME'] = '1'
+        code, stdout, stderr = self.run_main('export', 'APP_')
+        self.assertEqual(code, 0)
+        self.assertNotIn('OTHER', stdout)
+        self.assertIn('APP_BAD-NAME', stderr)
+
+        output = subprocess.check_output(
+            ['sh', '-c', stdout + 'printf %s "$APP_NAME"'])
+        self.assertEqual(output.decode(), "it's\nme")
+
+        self.assertEqual(self.run_main('export', 'APP_D', '-f', 'nul'),
+                         (0, 'APP_DEBUG=true\0', ''))
+        code, stdout, _ = self.run_main('export', 'OTHER', '-f', 'json')
+        self.assertEqual(json.loads(stdout), {'OTHER': '{"a": 1}'})
+
+    def test_003_check(self):
+        """Check reporting decoders and values which can't be decoded"""
+
+        self.assertEqual(self.run_main('check', 'APP_'), (0, (
+            'APP_DEBUG JSONDecoder\n'
+            'APP_HOSTS CollectionDecoder\n'
+            'APP_NAME -\n'), ''))
+
+        self.environ['APP_BROKEN'] = '{"a": '
+        code, stdout, stderr = self.run_main('check', '-f', 'json')
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(stdout)['invalid'], ['APP_BROKEN'])
+        self.assertIn('APP_BROKEN', stderr)
+
+    def test_004_bench(self):
+        """Smoke test for running benchmarks"""
+
+        code, stdout, _ = self.run_main('bench', 'decode_many',
+                                        '--scale', '0.001', '-f', 'json')
+        self.assertEqual(code, 0)
+        self.assertIn('decode_many', json.loads(stdout))
+
+        self.assertEqual(self.run_main('bench', 'unknown')[0], 2)
+
+    def test_005_module(self):
+        """Check running package as a module"""
+
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'smart_env', 'get', 'PATH'])
+        self.assertTrue(output.strip())
+
+    def test_006_values_without_json_type(self):
+        """Check printing values which JSON can't represent as they are"""
+
+        self.environ.update({'COMPLEX': '1+2j', 'TUPLE_KEYS': '{(1, 2): 3}',
+                             'MIXED_KEYS': "{1: 'a', 'b': 2}"})
+        code, stdout, stderr = self.run_main(
+            'get', 'COMPLEX', 'TUPLE_KEYS', 'MIXED_KEYS', '-f', 'json')
+        self.assertEqual((code, stderr), (0, ''))
+        self.assertEqual(json.loads(stdout), {
+            'COMPLEX': '(1+2j)',
+            'TUPLE_KEYS': {'[1, 2]': 3},
+            'MIXED_KEYS': {'1': 'a', 'b': 2},
+        })
+
+        self.assertEqual(self.run_main('get', 'TUPLE_KEYS'),
+                         (0, '{"[1, 2]": 3}\n', ''))
@@ -22,18 +22,27 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+import array
 import datetime
 import unittest
 
+from smart_env.decoders import ArrayDecoder
 from smart_env.decoders import BooleanDecoder
 from smart_env.decoders import CollectionDecoder
 from smart_env.decoders import IDecoder
 from smart_env.decoders import JSONDecoder
+from smart_env.decoders import NOT_DECODED
 from smart_env.decoders import SUPPORTED_DECODERS
+from smart_env.decoders import decode_value
+from smart_env.decoders import decode_values
+from smart_env.exceptions import DecodeError
 from smart_env.exceptions import EncodeError
 
 
-__all__ = ('DecoderTestCase',)
+__all__ = ('DecoderTestCase',
+           'EncoderTestCase',
+           'ArrayDecoderTestCase',
+           'BatchDecoderTestCase')
 
 
 class FakeDecoder(IDecoder):
@@ -144,3 +153,73 @@ class EncoderTestCase(unittest.TestCase):
             for value in invalid_values:
                 with self.assertRaises(EncodeError):
                     decoder.encode(value)
+
+
+class ArrayDecoderTestCase(unittest.TestCase):
+    """Test cases for decoding numeric lists into arrays"""
+
+    def test_decoding_lists(self):
+        """Check supported formats of numeric lists"""
+
+        for value, typecode, expected in (
+                ('[1.5, 2, 3]', 'd', [1.5, 2.0, 3.0]),
+                ('(1, 2)', 'i', [1, 2]),
+                (' 1, 2 , 3 ', 'H', [1, 2, 3]),
+                ('8000-8002, 9000, -5--4', 'l', [8000, 8001, 8002, 9000,
+                                                 -5, -4]),
+                ('[]', 'd', []),
+                ('', 'i', [])):
+            decoded = ArrayDecoder.decode(value, typecode)
+            self.assertIsInstance(decoded, array.array)
+            self.assertEqual(decoded.typecode, typecode)
+            self.assertEqual(decoded.tolist(), expected)
+
+    def test_decoding_invalid_value(self):
+        """Check that invalid values cannot be decoded"""
+
+        for value, typecode in (('a, b', 'd'), ('[1.5]', 'i'),
+                                ('1-2-3', 'i'), ('[1,]', 'i'),
+                                ('70000', 'H'), ('1-3', 'd')):
+            with self.assertRaises(DecodeError):
+                ArrayDecoder.decode(value, typecode)
+
+    def test_encoding(self):
+        """Check encoding arrays into JSON-compatible strings"""
+
+        self.assertEqual(ArrayDecoder.encode(array.array('i', [1, 2])),
+                         '[1, 2]')
+        with self.assertRaises(EncodeError):
+            ArrayDecoder.encode([1, 2])
+
+
+class BatchDecoderTestCase(unittest.TestCase):
+    """Test cases for decoding many values at once"""
+
+    VALUES = ['1', '2.5', 'true', 'null', 'abc', '[1', '2]', '3, 4',
+              '"text"', '{"a": 1}', "{'b': 2}", 'True', 'x y', ''] + \
+        [str(i) for i in range(40)] + ['NaN?', '-1e5']
+
+    def test_default_decode_many(self):
+        """Check that failed values are marked in default implementation"""
+
+        self.assertEqual(BooleanDecoder.decode_many(['true', '1', 'False']),
+                         [True, NOT_DECODED, False])
+
+    def test_json_decode_many(self):
+        """Check that batch JSON decoding equals item by item one"""
+
+        expected = []
+        for value in self.VALUES:
+            try:
+                expected.append(JSONDecoder.decode(value))
+            except DecodeError:
+                expected.append(NOT_DECODED)
+
+        self.assertEqual(JSONDecoder.decode_many(self.VALUES), expected)
+        self.assertEqual(JSONDecoder.decode_many([]), [])
+
+    def test_decode_values(self):
+        """Check that decoding chain for many values equals single one"""
+
+        self.assertEqual(decode_values(self.VALUES),
+                         [decode_value(value) for value in self.VALUES])
@@ -0,0 +1,109 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from smart_env import Env
+from smart_env import FrozenBackend
+from smart_env.diff import Change
+from smart_env.diff import diff
+
+
+__all__ = ('DiffTestCase', 'EnvDiffTestCase')
+
+
+class DiffTestCase(unittest.TestCase):
+    """Test cases for computing difference between mappings"""
+
+    def test_001_no_changes(self):
+        """Check that equal mappings give empty diff"""
+
+        changes = diff({'A': '1'}, {'A': '1'})
+        self.assertFalse(changes)
+        self.assertEqual(list(changes), [])
+
+    def test_002_changes(self):
+        """Check added, removed and changed variables"""
+
+        changes = diff({'A': '1', 'B': '2', 'C': '3'},
+                       FrozenBackend({'A': '1', 'B': '[2]', 'D': 'true'}))
+
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(changes.added, {'D': Change('D', None, 'true')})
+        self.assertEqual(changes.removed, {'C': Change('C', '3', None)})
+        self.assertEqual(changes.changed, {'B': Change('B', '2', '[2]')})
+        self.assertEqual([change.name for change in changes],
+                         ['C', 'B', 'D'])
+
+    def test_003_decoded_values(self):
+        """Check decoded old and new values of changes"""
+
+        change = diff({'A': '1'}, {'A': "{'key': True}"}).changed['A']
+        self.assertEqual(change.old_decoded, 1)
+        self.assertEqual(change.new_decoded, {'key': True})
+
+        change = diff({}, {'A': 'true'}).added['A']
+        self.assertIsNone(change.old_decoded)
+        self.assertIs(change.new_decoded, True)
+
+
+class EnvDiffTestCase(unittest.TestCase):
+    """Test cases for ENV.diff() and ENV.apply_diff()"""
+
+    def setUp(self):
+        self.backend = {'A': '1', 'B': '2', 'C': '3'}
+        self.env = Env(self.backend)
+
+    def test_001_snapshot(self):
+        """Check that snapshot is a read-only copy"""
+
+        snapshot = self.env.snapshot()
+        self.env.A = '10'
+
+        self.assertEqual(dict(snapshot.items()), {'A': '1', 'B': '2',
+                                                  'C': '3'})
+        with self.assertRaises(TypeError):
+            snapshot['A'] = '2'
+
+    def test_002_diff_with_snapshot(self):
+        """Check diff between current variables and a snapshot"""
+
+        snapshot = self.env.snapshot()
+        del self.env.A
+        self.env.B = '20'
+
+        changes = self.env.diff(snapshot)
+        self.assertEqual(sorted(changes.added), ['A'])
+        self.assertEqual(sorted(changes.changed), ['B'])
+        self.assertEqual(changes.removed, {})
+
+    def test_003_apply_diff(self):
+        """Check that applying diff makes variables equal to the target"""
+
+        target = {'A': '1', 'B': '20', 'D': '4'}
+        changes = self.env.diff(target)
+        self.env.apply_diff(changes)
+
+        self.assertEqual(self.backend, target)
+        self.assertFalse(self.env.diff(target))
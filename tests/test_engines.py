@@ -0,0 +1,115 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+import unittest
+
+from smart_env import engines
+from smart_env.decoders import JSONDecoder
+from smart_env.engines import JSONEngine
+
+
+__all__ = ('JSONEngineTestCase',)
+
+
+class JSONEngineTestCase(unittest.TestCase):
+    """Test cases for pluggable JSON engines"""
+
+    VALUES = ['0.1', '5e-324', '-0.0', '1.7976931348623157e308', '1e400',
+              '9223372036854775808', '18446744073709551616',
+              '-9223372036854775809', '0.12345678901234567890123',
+              'NaN', '-Infinity', '"\\ud800"', '"caf\\u00e9"', ' [1, 2] ',
+              '{"a": 1, "a": 2}', 'true', 'null', '[1,]', "{'a': 1}",
+              b'[1, 2]', b'"\xc3\xa9"', b'12345678901234567890']
+
+    def setUp(self):
+        self.engine = engines.get_json_engine()
+
+    def tearDown(self):
+        engines.set_json_engine(self.engine.name)
+
+    def decode_all(self):
+        results = []
+        for value in self.VALUES:
+            try:
+                results.append(repr(JSONDecoder.decode(value)))
+            except Exception as error:
+                results.append(type(error))
+        return results
+
+    def test_001_select(self):
+        """Check selecting engines"""
+
+        self.assertEqual(engines.available_engines()[-1], 'json')
+        self.assertEqual(engines.set_json_engine('json').name, 'json')
+        self.assertIs(engines.loads, json.loads)
+
+        engine = engines.set_json_engine()
+        self.assertEqual(engine.name, engines.available_engines()[0])
+        self.assertIs(engines.get_json_engine(), engine)
+
+        with self.assertRaises(ValueError):
+            engines.set_json_engine('unknown')
+
+    def test_002_identical_results(self):
+        """Check that all installed engines decode values identically"""
+
+        engines.set_json_engine('json')
+        expected = self.decode_all()
+        for name in engines.available_engines():
+            engines.set_json_engine(name)
+            self.assertEqual(self.decode_all(), expected, name)
+
+    def test_003_fallback(self):
+        """Check that values rejected by engine are parsed with json"""
+
+        calls = []
+
+        def loads(value):
+            calls.append(value)
+            raise ValueError
+
+        engine = JSONEngine('strict', loads)
+        self.assertTrue(math.isnan(engine.loads('[NaN]')[0]))
+        self.assertEqual(engine.loads('[12345678901234567890]'),
+                         [12345678901234567890])
+        self.assertEqual(calls, ['[NaN]'])
+        with self.assertRaises(ValueError):
+            engine.loads('invalid')
+        with self.assertRaises(TypeError):
+            engine.loads(None)
+        self.assertEqual(engine.dumps({'a': [1]}), '{"a": [1]}')
+
+    def test_004_environment_variable(self):
+        """Check forcing engine with environment variable"""
+
+        environ = dict(os.environ, SMART_ENV_JSON_ENGINE='json')
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'from smart_env import engines; '
+             'print(engines.get_json_engine().name)'], env=environ)
+        self.assertEqual(output.decode().strip(), 'json')
@@ -22,15 +22,31 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+import copy
 import datetime
 import itertools
+import os
+import subprocess
+import sys
+import threading
 from time import time
 import unittest
 
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
 from smart_env import ENV
+from smart_env import Env
+from smart_env.exceptions import DecodeBudgetExceeded
+from smart_env.testing import EnvIsolationMixin
 
 
-__all__ = ('EnvTestCase',)
+__all__ = ('EnvTestCase',
+           'ENVRepresentationTestCase',
+           'ENVMappingTestCase',
+           'ENVConsistencyTestCase')
 
 
 class EnvTestCase(unittest.TestCase):
@@ -136,13 +152,33 @@ class EnvTestCase(unittest.TestCase):
         with self.assertRaises(TypeError):
             ENV._ENV__decode(object())
 
+    def test_012_copy(self):
+        """Check that Env can be copied"""
+
+        env = copy.copy(Env({'A': '1'}))
+        self.assertEqual(env.A, '1')
+        with self.assertRaises(AttributeError):
+            Env.__new__(Env)._recorder
+
+    def test_013_light_import(self):
+        """Check that modules of opt-in features are not imported
+        with smart_env"""
+
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'import sys, smart_env; '
+             'print(sorted(set(sys.modules) & {"multiprocessing", '
+             '"tempfile", "hashlib", "mmap", "smart_env.cache", '
+             '"smart_env.parallel", "smart_env.shared"}))'])
+        self.assertEqual(output.decode().strip(), '[]')
 
-class ENVRepresentationTestCase(unittest.TestCase):
+
+class ENVRepresentationTestCase(EnvIsolationMixin, unittest.TestCase):
     """Test cases for representations of ENV class"""
 
     def setUp(self):
         """Erase environment before running tests"""
 
+        super(ENVRepresentationTestCase, self).setUp()
         for var in ENV:
             setattr(ENV, var, None)
 
@@ -193,3 +229,226 @@ class ENVRepresentationTestCase(unittest.TestCase):
         )
 
         self.assertEqual(dir(ENV), dir_list)
+
+
+class ENVMappingTestCase(unittest.TestCase):
+    """Test cases for Mapping protocol of ENV class"""
+
+    def setUp(self):
+        """Erase environment before running tests"""
+
+        self.environ = dict(os.environ)
+        for var in ENV:
+            setattr(ENV, var, None)
+
+        os.environ['MAPPING_VAR_1'] = '[1, 2]'
+        os.environ['MAPPING_VAR_2'] = 'true'
+
+    def tearDown(self):
+        ENV.disable_automatic_type_cast()
+        os.environ.clear()
+        os.environ.update(self.environ)
+
+    def test_001_is_mapping(self):
+        """Check that ENV is registered as a Mapping"""
+
+        self.assertIsInstance(ENV, Mapping)
+
+    def test_002_len(self):
+        """Check len() of ENV"""
+
+        self.assertEqual(len(ENV), 2)
+        del ENV.MAPPING_VAR_1
+        self.assertEqual(len(ENV), 1)
+
+    def test_003_get_item(self):
+        """Check ENV[name] with and without type cast"""
+
+        self.assertEqual(ENV['MAPPING_VAR_1'], '[1, 2]')
+
+        ENV.enable_automatic_type_cast()
+        self.assertEqual(ENV['MAPPING_VAR_1'], [1, 2])
+
+        with self.assertRaises(KeyError):
+            ENV['MAPPING_VAR_3']
+
+    def test_004_get(self):
+        """Check ENV.get() with defaults"""
+
+        self.assertEqual(ENV.get('MAPPING_VAR_2'), 'true')
+        self.assertIsNone(ENV.get('MAPPING_VAR_3'))
+        self.assertEqual(ENV.get('MAPPING_VAR_3', 'default'), 'default')
+
+        ENV.enable_automatic_type_cast()
+        self.assertIs(ENV.get('MAPPING_VAR_2'), True)
+
+    def test_005_views(self):
+        """Check keys(), items() and values() views"""
+
+        self.assertEqual(list(ENV.keys()), ['MAPPING_VAR_1', 'MAPPING_VAR_2'])
+        self.assertIn('MAPPING_VAR_1', ENV.keys())
+        self.assertEqual(len(ENV.items()), 2)
+
+        items = ENV.items()
+        values = ENV.values()
+        ENV.enable_automatic_type_cast()
+
+        # Views are lazy, so they respect current type cast mode
+        self.assertEqual(list(items), [('MAPPING_VAR_1', [1, 2]),
+                                       ('MAPPING_VAR_2', True)])
+        self.assertEqual(list(values), [[1, 2], True])
+        self.assertIn(('MAPPING_VAR_2', True), items)
+
+        os.environ['MAPPING_VAR_3'] = '1'
+        self.assertEqual(len(items), 3)
+
+    def test_006_get_array(self):
+        """Check reading variable as array of numbers"""
+
+        self.assertEqual(ENV.get_array('MAPPING_VAR_1', 'i').tolist(), [1, 2])
+        self.assertEqual(
+            memoryview(ENV.get_array('MAPPING_VAR_1', 'd')).tolist(),
+            [1.0, 2.0])
+        self.assertIsNone(ENV.get_array('MAPPING_VAR_3'))
+
+    def test_007_get_many(self):
+        """Check reading many variables at once"""
+
+        names = ['MAPPING_VAR_1', 'MAPPING_VAR_2', 'MAPPING_VAR_3']
+        self.assertEqual(ENV.get_many(names, 'default'),
+                         {'MAPPING_VAR_1': '[1, 2]',
+                          'MAPPING_VAR_2': 'true',
+                          'MAPPING_VAR_3': 'default'})
+
+        ENV.enable_automatic_type_cast()
+        os.environ['MAPPING_VAR_3'] = 'null'
+        self.assertEqual(ENV.get_many(names, 'default'),
+                         {'MAPPING_VAR_1': [1, 2],
+                          'MAPPING_VAR_2': True,
+                          'MAPPING_VAR_3': None})
+
+    def test_008_decoded_snapshot(self):
+        """Check snapshot with decoded values"""
+
+        self.assertEqual(dict(ENV.snapshot(decode=True).items()),
+                         {'MAPPING_VAR_1': [1, 2], 'MAPPING_VAR_2': True})
+
+    def test_009_dict(self):
+        """Check that ENV can be converted to dict"""
+
+        ENV.enable_automatic_type_cast()
+        self.assertEqual(dict(ENV), {'MAPPING_VAR_1': [1, 2],
+                                     'MAPPING_VAR_2': True})
+
+
+class ENVConsistencyTestCase(unittest.TestCase):
+    """Test cases for atomic writes and consistent reads"""
+
+    def setUp(self):
+        self.env = Env({'A': '0', 'B': '0'})
+
+    def test_001_update(self):
+        """Check setting and unsetting many variables at once"""
+
+        self.env.update({'A': 1, 'B': None, 'C': [1]})
+        self.assertEqual(dict(self.env), {'A': '1', 'C': '[1]'})
+        self.env.update([('A', 'a')])
+        self.assertEqual(self.env.A, 'a')
+
+    def test_002_consistent(self):
+        """Check that view is published once per write"""
+
+        with self.env.consistent() as view:
+            self.assertEqual(dict(view), {'A': '0', 'B': '0'})
+        with self.env.consistent() as other:
+            self.assertIs(other, view)
+
+        self.env.A = 1
+        self.assertEqual(view.A, '0')
+        with self.env.consistent() as view:
+            self.assertEqual(view.A, '1')
+            with self.assertRaises(TypeError):
+                view.A = 2
+
+        self.env.enable_automatic_type_cast()
+        with self.env.consistent() as view:
+            self.assertEqual(view.A, 1)
+
+    def test_003_no_torn_reads(self):
+        """Check that readers never see update of many variables
+        half-applied"""
+
+        errors = []
+        stopped = threading.Event()
+
+        def read():
+            while not stopped.is_set():
+                with self.env.consistent() as view:
+                    a, b = view.A, view.B
+                if a != b:
+                    errors.append((a, b))
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for i in range(1, 2000):
+                self.env.update({'A': i, 'B': i})
+                if i % 2:
+                    self.env.apply_diff(self.env.diff({'A': 'x', 'B': 'x'}))
+        finally:
+            stopped.set()
+            for reader in readers:
+                reader.join()
+        self.assertEqual(errors, [])
+
+    def test_004_decoding_options(self):
+        """Check that view decodes variables like Env does"""
+
+        self.env.update({'H': 'db', 'URL': 'pg://${H}/x', 'DEEP': '[[[1]]]'})
+        self.env.enable_automatic_type_cast()
+        self.env.enable_interpolation()
+        self.env.set_decode_budget(max_depth=2)
+        with self.env.consistent() as view:
+            self.assertEqual(view.URL, 'pg://db/x')
+            with self.assertRaises(DecodeBudgetExceeded):
+                view.DEEP
+
+        self.env.set_decode_budget()
+        with self.env.consistent() as view:
+            self.assertEqual(view.DEEP, [[[1]]])
+
+    def test_005_published_by_writes(self):
+        """Check that writes publish new versions, so readers don't
+        wait for writers holding the lock"""
+
+        with self.env.consistent() as view:
+            self.assertEqual(view.A, '0')
+        self.env.update({'A': 1, 'B': None, 'C': 2})
+        del self.env.C
+        self.env.D = 3
+
+        held = threading.Event()
+        release = threading.Event()
+        timeouts = []
+
+        def write():
+            with self.env._lock:
+                held.set()
+                if not release.wait(5):
+                    timeouts.append(True)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        held.wait()
+        try:
+            with self.env.consistent() as view:
+                self.assertEqual(dict(view), {'A': '1', 'D': '3'})
+        finally:
+            release.set()
+            writer.join()
+        self.assertEqual(timeouts, [])
+
+        self.env.set_sources([{'E': '4'}, self.env.backend])
+        with self.env.consistent() as view:
+            self.assertEqual(dict(view), {'A': '1', 'D': '3', 'E': '4'})
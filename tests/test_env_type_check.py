@@ -110,3 +110,8 @@ class EnvWithTypeCastTestCase(unittest.TestCase):
         value = "['Hello', ['world']]"
         self.setup_value(value)
         self.assertEqual(getattr(ENV, self.KEY), ['Hello', ['world']])
+
+    def test_012_retrieve_text_with_spaces(self):
+        value = "Text with spaces"
+        self.setup_value(value)
+        self.assertEqual(getattr(ENV, self.KEY), value)
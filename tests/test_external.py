@@ -0,0 +1,215 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from smart_env import Env
+from smart_env.external import ExternalValues
+from smart_env.external import is_reference
+from smart_env.external import write_external
+
+
+__all__ = ('ExternalValuesTestCase',)
+
+
+CHILD = """
+from smart_env import ENV
+ENV.enable_automatic_type_cast()
+ENV.enable_external_references()
+print(ENV.CONFIG['hosts'][1])
+"""
+
+
+@unittest.skipUnless(os.name == 'posix', "requires POSIX")
+class ExternalValuesTestCase(unittest.TestCase):
+    """Test cases for values stored out of the environment"""
+
+    def setUp(self):
+        self.backend = {}
+        self.env = Env(self.backend)
+        self.env.enable_automatic_type_cast()
+        self.config = {'hosts': ['a', 'b'], 'port': 1}
+
+    def tearDown(self):
+        for name in list(self.backend):
+            self.env.set_external(name, None)
+
+    def test_001_references(self):
+        """Check only exact references are resolved"""
+
+        self.assertTrue(is_reference('@fd:7'))
+        self.assertTrue(is_reference('@file:/tmp/config'))
+        for value in ('@fd:7x', '@fd:', '@file:relative', 'fd:7',
+                      'user@fd:7', '@file:/a\x00b'):
+            self.assertFalse(is_reference(value), value)
+
+        self.backend['TEXT'] = '@fd:-1'
+        self.assertEqual(self.env.TEXT, '@fd:-1')
+
+    def test_002_set_external(self):
+        """Check value is decoded through the reference"""
+
+        reference = self.env.set_external('CONFIG', self.config)
+        self.assertTrue(is_reference(reference))
+        self.assertEqual(self.backend['CONFIG'], reference)
+        self.assertEqual(self.env.CONFIG, self.config)
+        self.assertEqual(self.env.get_many(['CONFIG']),
+                         {'CONFIG': self.config})
+
+        self.env.disable_automatic_type_cast()
+        self.assertEqual(self.env.CONFIG, reference)
+
+    def test_003_file(self):
+        """Check values written into temporary files"""
+
+        reference = self.env.set_external('CONFIG', self.config,
+                                          method='file')
+        path = reference[len('@file:'):]
+        self.assertTrue(reference.startswith('@file:/'))
+        self.assertEqual(self.env.CONFIG, self.config)
+        self.assertEqual(self.env.external_fds(), ())
+
+        self.env.set_external('CONFIG', None)
+        self.assertNotIn('CONFIG', self.env)
+        self.assertFalse(os.path.exists(path))
+
+    def test_004_unreadable(self):
+        """Check reference which can't be read is returned as is"""
+
+        reference, path = write_external('CONFIG', b'[1]', method='file')
+        os.unlink(path)
+        self.backend['CONFIG'] = reference
+        self.env.enable_external_references()
+        self.assertEqual(self.env.CONFIG, reference)
+
+    def test_005_memoized(self):
+        """Check file is read again only when it's changed"""
+
+        reference, path = write_external('CONFIG', b'[1]', method='file')
+        self.addCleanup(os.unlink, path)
+        externals = ExternalValues()
+        externals.inherited = True
+        self.assertEqual(externals.resolve(reference), '[1]')
+        externals._resolved[reference] = (
+            externals._resolved[reference][0], '[2]')
+        self.assertEqual(externals.resolve(reference), '[2]')
+
+        with open(path, 'w') as f:
+            f.write('[1, 3]')
+        self.assertEqual(externals.resolve(reference), '[1, 3]')
+
+    def test_006_replace(self):
+        """Check file descriptor is closed when value is replaced"""
+
+        self.env.set_external('CONFIG', self.config)
+        fds = self.env.external_fds()
+        self.env.set_external('CONFIG', [1, 2])
+        self.assertEqual(self.env.CONFIG, [1, 2])
+        for fd in fds:
+            if fd not in self.env.external_fds():
+                with self.assertRaises(OSError):
+                    os.fstat(fd)
+
+    def test_007_child_process(self):
+        """Check child process decodes value through the reference"""
+
+        self.env.set_external('CONFIG', self.config)
+        env = dict(os.environ, **self.env.child_env())
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))
+        output = subprocess.check_output(
+            [sys.executable, '-c', CHILD], env=env,
+            pass_fds=self.env.external_fds())
+        self.assertEqual(output.decode().strip(), 'b')
+
+    def test_008_inherited(self):
+        """Check only references written by set_external() are resolved"""
+
+        reference, path = write_external('CONFIG', b'[1]', method='file')
+        self.addCleanup(os.unlink, path)
+        fd, other = tempfile.mkstemp()
+        self.addCleanup(os.unlink, other)
+        os.write(fd, b'[2]')
+        self.addCleanup(os.close, fd)
+        self.backend.update(CONFIG=reference, OTHER='@file:' + other,
+                            FD='@fd:{}'.format(fd),
+                            HOSTNAME='@file:/etc/hostname')
+
+        self.assertEqual(self.env.CONFIG, reference)
+        self.env.enable_external_references()
+        self.assertEqual(self.env.CONFIG, [1])
+        for name in ('OTHER', 'FD', 'HOSTNAME'):
+            self.assertEqual(self.env[name], self.backend[name])
+
+        self.env.disable_external_references()
+        self.assertEqual(self.env.CONFIG, reference)
+
+    def test_009_freeze_for_fork(self):
+        """Check external values are served frozen"""
+
+        self.env.set_external('CONFIG', self.config)
+        self.env.freeze_for_fork(['CONFIG'])
+        try:
+            self.assertEqual(self.env.CONFIG['hosts'], ('a', 'b'))
+            self.assertEqual(self.env.get_many(['CONFIG'])['CONFIG'],
+                             self.env.CONFIG)
+        finally:
+            if hasattr(gc, 'unfreeze'):
+                gc.unfreeze()
+
+    def test_010_overwrite(self):
+        """Check files are released when variables are set, unset
+        or restored through Env"""
+
+        token = self.env.checkpoint()
+        self.env.set_external('CONFIG', self.config)
+        fds = self.env.external_fds()
+        reference = self.env.set_external('HOSTS', ['a'], method='file')
+        path = reference[len('@file:'):]
+        self.env.OTHER = 1
+
+        self.env.CONFIG = self.config
+        self.assertEqual(self.env.external_fds(), ())
+        for fd in fds:
+            with self.assertRaises(OSError):
+                os.fstat(fd)
+        del self.env.HOSTS
+        self.assertFalse(os.path.exists(path))
+
+        self.env.set_external('CONFIG', self.config)
+        fds = self.env.external_fds()
+        reference = self.env.set_external('HOSTS', ['a'], method='file')
+        path = reference[len('@file:'):]
+        self.env.restore(token)
+        self.assertEqual(self.backend, {})
+        self.assertEqual(self.env.external_fds(), ())
+        for fd in fds:
+            with self.assertRaises(OSError):
+                os.fstat(fd)
+        self.assertFalse(os.path.exists(path))
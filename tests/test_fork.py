@@ -0,0 +1,81 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import gc
+import unittest
+
+from smart_env import Env
+from smart_env.fork import Freezer
+
+
+__all__ = ('FreezeForForkTestCase',)
+
+
+class FreezeForForkTestCase(unittest.TestCase):
+    """Test cases for freezing decoded values before fork"""
+
+    def setUp(self):
+        self.backend = {'CONFIG': '{"hosts": ["a", "b"], "db": {"port": 1}}',
+                        'TAGS': "{'x', 'y'}", 'TEXT': 'text'}
+        self.env = Env(self.backend)
+        self.env.enable_automatic_type_cast()
+
+    def tearDown(self):
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    def test_001_freezer(self):
+        """Check converting values into immutable containers"""
+
+        freezer = Freezer()
+        frozen = freezer.freeze({'a': [1, {'b': [2]}], 'c': {3}})
+        self.assertEqual(frozen['a'][1]['b'], (2,))
+        self.assertEqual(frozen['c'], frozenset([3]))
+        with self.assertRaises(TypeError):
+            frozen['a'] = 1
+        with self.assertRaises(TypeError):
+            frozen['a'][1]['b'] = 1
+        self.assertEqual(freezer.containers, 5)
+        self.assertGreater(freezer.size, 0)
+
+    def test_002_freeze_for_fork(self):
+        """Check that frozen values are returned while raw values are
+        the same"""
+
+        report = self.env.freeze_for_fork(['CONFIG', 'TAGS', 'TEXT',
+                                           'MISSING'])
+        self.assertEqual(report.variables, 3)
+        self.assertEqual(report.containers, 4)
+        if hasattr(gc, 'freeze'):
+            self.assertGreater(report.gc_objects, 0)
+
+        config = self.env.CONFIG
+        self.assertIs(self.env.get('CONFIG'), config)
+        self.assertEqual(config['hosts'], ('a', 'b'))
+        self.assertEqual(config['db']['port'], 1)
+        self.assertIs(self.env.get_many(['CONFIG'])['CONFIG'], config)
+        self.assertEqual(self.env.TAGS, frozenset(['x', 'y']))
+
+        self.env.CONFIG = {'hosts': []}
+        self.assertEqual(self.env.CONFIG, {'hosts': []})
@@ -0,0 +1,154 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from smart_env import Env
+from smart_env.exceptions import InterpolationError
+from smart_env.interpolation import parse
+
+
+__all__ = ('InterpolationTestCase',)
+
+
+class InterpolationTestCase(unittest.TestCase):
+    """Test cases for expanding references between variables"""
+
+    def setUp(self):
+        self.backend = {
+            'DB_HOST': 'db',
+            'DB_PORT': '5432',
+            'DB_URL': 'postgres://${DB_HOST}:${DB_PORT}/app',
+            'DB_CONFIG': '{"url": "${DB_URL}", "pool": ${DB_POOL:-5}}',
+        }
+        self.env = Env(self.backend)
+        self.env.enable_interpolation()
+
+    def test_001_parse(self):
+        """Check splitting value into text and references"""
+
+        self.assertEqual(parse('plain $HOME {x}'), (('plain $HOME {x}',), ()))
+        self.assertEqual(parse('${A}:${B:-b c}/${C:-}'), (
+            (('A', None), ':', ('B', 'b c'), '/', ('C', '')),
+            ('A', 'B', 'C')))
+
+    def test_002_expand(self):
+        """Check expanding references and defaults"""
+
+        self.assertEqual(self.env.DB_URL, 'postgres://db:5432/app')
+        self.assertEqual(self.env.get('DB_CONFIG'),
+                         '{"url": "postgres://db:5432/app", "pool": 5}')
+
+        self.env.enable_automatic_type_cast()
+        self.assertEqual(self.env['DB_CONFIG'],
+                         {'url': 'postgres://db:5432/app', 'pool': 5})
+
+        self.env.disable_interpolation()
+        self.assertEqual(self.env.DB_URL, self.backend['DB_URL'])
+
+    def test_003_unset(self):
+        """Check that unset and empty variables are expanded like in shell"""
+
+        self.backend['VALUE'] = '[${MISSING}|${EMPTY:-empty}|${MISSING:-}]'
+        self.backend['EMPTY'] = ''
+        self.assertEqual(self.env.VALUE, '[|empty|]')
+        self.assertIsNone(self.env.MISSING)
+
+    def test_004_reexpand_dependents(self):
+        """Check that changing variable changes all its dependents"""
+
+        self.assertIn('5432', self.env.DB_CONFIG)
+
+        self.env.DB_PORT = 6432
+        self.assertEqual(self.env.DB_URL, 'postgres://db:6432/app')
+        self.assertIn('6432', self.env.DB_CONFIG)
+
+        self.env.DB_POOL = 10
+        self.assertIn('"pool": 10', self.env.DB_CONFIG)
+
+        del self.env.DB_HOST
+        self.assertEqual(self.env.DB_URL, 'postgres://:6432/app')
+
+        # Changes bypassing Env are seen for variables read directly
+        self.backend['DB_URL'] = 'sqlite://'
+        self.assertEqual(self.env.DB_URL, 'sqlite://')
+
+    def test_005_cycle(self):
+        """Check that cyclic references are reported"""
+
+        self.backend.update({'A': 'x${B}', 'B': '${C}', 'C': '${A:-}'})
+        with self.assertRaises(InterpolationError) as context:
+            self.env.A
+        self.assertEqual(context.exception.cycle, ['A', 'B', 'C', 'A'])
+
+        self.env.C = 'c'
+        self.assertEqual(self.env.A, 'xc')
+
+    def test_006_long_chain(self):
+        """Check that long chains are expanded without recursion"""
+
+        for i in range(1, 5000):
+            self.backend['V{}'.format(i)] = '${{V{}}}'.format(i - 1)
+        self.backend['V0'] = 'end'
+        self.assertEqual(self.env.V4999, 'end')
+
+        self.env.V0 = 'changed'
+        self.assertEqual(self.env.V4999, 'changed')
+
+    def test_007_raw_values(self):
+        """Check that snapshots, diffs and child environment keep raw
+        values with several sources"""
+
+        overrides = {'DB_HOST': 'replica'}
+        self.env.set_sources([overrides, self.backend])
+        template = self.backend['DB_URL']
+
+        snapshot = self.env.snapshot()
+        self.assertEqual(snapshot['DB_URL'], template)
+        self.assertEqual(self.env.snapshot(decode=True)['DB_URL'],
+                         'postgres://replica:5432/app')
+        self.assertFalse(self.env.diff(snapshot))
+        self.assertEqual(self.env.child_env()['DB_URL'], template)
+        self.assertEqual(self.env.child_env()['DB_HOST'], 'replica')
+
+    def test_008_write_while_expanding(self):
+        """Check that values expanded while a variable they depend on
+        was changed are not memoized"""
+
+        writes = []
+
+        class Backend(dict):
+            def get(self, name, default=None):
+                value = dict.get(self, name, default)
+                if name == 'DB_HOST' and not writes:
+                    # Another thread changes variable right after it
+                    # was read for expansion
+                    writes.append(name)
+                    env.DB_HOST = 'replica'
+                return value
+
+        env = Env(Backend(self.backend))
+        env.enable_interpolation()
+        self.assertEqual(env.DB_URL, 'postgres://db:5432/app')
+        self.assertEqual(env.DB_URL, 'postgres://replica:5432/app')
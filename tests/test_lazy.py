@@ -0,0 +1,113 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import sys
+import types
+import unittest
+
+from smart_env import Env
+
+
+__all__ = ('LazySettingsTestCase', 'UnsupportedPythonTestCase')
+
+
+LAZY_MODULES = sys.version_info >= (3, 7)
+
+
+@unittest.skipIf(not LAZY_MODULES, "module __getattr__ requires Python 3.7+")
+class LazySettingsTestCase(unittest.TestCase):
+    """Test cases for lazy settings modules"""
+
+    MODULE = 'smart_env_lazy_settings'
+
+    def setUp(self):
+        self.backend = {'DEBUG': 'true', 'DB_CONFIG': '{"host": "db"}'}
+        self.env = Env(self.backend)
+        self.env.enable_automatic_type_cast()
+        self.module = sys.modules[self.MODULE] = types.ModuleType(self.MODULE)
+
+    def tearDown(self):
+        del sys.modules[self.MODULE]
+
+    def test_001_read_on_first_access(self):
+        """Check that settings are read once and stored in globals"""
+
+        self.env.bind_module(self.MODULE, {'DEBUG': 'DEBUG',
+                                           'DATABASES': 'DB_CONFIG'})
+        self.assertNotIn('DATABASES', vars(self.module))
+
+        self.assertEqual(self.module.DATABASES, {'host': 'db'})
+        self.assertIn('DATABASES', vars(self.module))
+
+        self.backend['DB_CONFIG'] = '{"host": "other"}'
+        self.assertEqual(self.module.DATABASES, {'host': 'db'})
+
+    def test_002_names_list(self):
+        """Check binding list of variable names"""
+
+        self.env.bind_module(self.MODULE, ['DEBUG', 'MISSING'])
+        self.assertIs(self.module.DEBUG, True)
+        self.assertIsNone(self.module.MISSING)
+
+        with self.assertRaises(AttributeError):
+            self.module.UNKNOWN
+
+    def test_003_dir(self):
+        """Check that dir() lists settings which are not read yet"""
+
+        self.env.bind_module(self.MODULE, ['DEBUG', 'DB_CONFIG'])
+        names = dir(self.module)
+        self.assertIn('DEBUG', names)
+        self.assertIn('DB_CONFIG', names)
+        self.assertIn('__name__', names)
+
+    def test_004_preload(self):
+        """Check reading all settings at once"""
+
+        settings = self.env.bind_module(self.MODULE, ['DEBUG', 'DB_CONFIG'])
+        self.assertEqual(settings.names, ['DEBUG', 'DB_CONFIG'])
+
+        settings.preload()
+        self.assertIs(vars(self.module)['DEBUG'], True)
+        self.assertEqual(vars(self.module)['DB_CONFIG'], {'host': 'db'})
+
+    def test_005_existing_getattr(self):
+        """Check that module's own __getattr__ is still used"""
+
+        self.module.__getattr__ = lambda name: name.lower()
+        self.env.bind_module(self.MODULE, ['DEBUG'])
+
+        self.assertIs(self.module.DEBUG, True)
+        self.assertEqual(self.module.OTHER, 'other')
+
+
+@unittest.skipIf(LAZY_MODULES, "module __getattr__ is supported")
+class UnsupportedPythonTestCase(unittest.TestCase):
+    """Test cases for lazy settings modules on Python < 3.7"""
+
+    def test_001_error(self):
+        """Check that binding module raises a clear error"""
+
+        with self.assertRaises(RuntimeError):
+            Env({}).bind_module(__name__, ['DEBUG'])
@@ -0,0 +1,101 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import gc
+import os
+import unittest
+
+from smart_env import ENV
+from smart_env import Env
+from smart_env.parallel import decode_all
+
+
+__all__ = ('ParallelDecodeTestCase',)
+
+
+class ParallelDecodeTestCase(unittest.TestCase):
+    """Test cases for decoding many values at once"""
+
+    VALUES = {
+        'PARALLEL_LIST': "['a', 'b']",
+        'PARALLEL_DICT': '{"key": [1, 2, 3]}',
+        'PARALLEL_BOOL': 'True',
+        'PARALLEL_TEXT': 'some text',
+    }
+    EXPECTED = {
+        'PARALLEL_LIST': ['a', 'b'],
+        'PARALLEL_DICT': {'key': [1, 2, 3]},
+        'PARALLEL_BOOL': True,
+        'PARALLEL_TEXT': 'some text',
+    }
+
+    def setUp(self):
+        os.environ.update(self.VALUES)
+
+    def tearDown(self):
+        for name in self.VALUES:
+            os.environ.pop(name, None)
+
+    def test_001_serial(self):
+        """Check serial decoding"""
+
+        self.assertEqual(dict(decode_all(self.VALUES, workers=1)),
+                         self.EXPECTED)
+
+    def test_002_process_pool(self):
+        """Check decoding in process pool"""
+
+        decoded = decode_all(self.VALUES, workers=2, threshold=10)
+        self.assertEqual(dict(decoded), self.EXPECTED)
+        self.assertEqual(list(decoded), list(self.VALUES))
+
+    def test_003_env_decode_all(self):
+        """Check ENV.decode_all() keeps order and reports unset values"""
+
+        names = ['PARALLEL_MISSING'] + sorted(self.VALUES)
+        decoded = ENV.decode_all(names, workers=2, threshold=0)
+
+        self.assertEqual(list(decoded), names)
+        self.assertIsNone(decoded.pop('PARALLEL_MISSING'))
+        self.assertEqual(dict(decoded), self.EXPECTED)
+
+    def test_004_env_decode_all_stored(self):
+        """Check values decoded in process pool are stored and frozen
+        values are returned as they are"""
+
+        env = Env(dict(self.VALUES))
+        store = env.enable_compact_store(lists_as_tuples=True)
+        decoded = env.decode_all(self.VALUES, workers=2, threshold=10)
+        self.assertEqual(decoded['PARALLEL_LIST'], ('a', 'b'))
+        self.assertIs(decoded['PARALLEL_DICT'],
+                      store.get(self.VALUES['PARALLEL_DICT']))
+
+        env.disable_compact_store()
+        env.freeze_for_fork(['PARALLEL_DICT'])
+        try:
+            decoded = env.decode_all(self.VALUES, workers=2, threshold=10)
+        finally:
+            if hasattr(gc, 'unfreeze'):
+                gc.unfreeze()
+        self.assertEqual(decoded['PARALLEL_DICT']['key'], (1, 2, 3))
@@ -0,0 +1,96 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import unittest
+
+from smart_env import Env
+from smart_env.paths import compile_path
+
+
+__all__ = ('PathTestCase',)
+
+
+class PathTestCase(unittest.TestCase):
+    """Test cases for dotted paths into decoded values"""
+
+    CONFIG = {
+        'default': {'HOST': 'db', 'PORT': 5432},
+        'replicas': [{'host': 'r1'}, {'host': 'r2', 'port': 6432}],
+        '0': 'zero',
+    }
+
+    def setUp(self):
+        self.backend = {'DATABASES': json.dumps(self.CONFIG),
+                        'HOSTS': "('a', 'b')"}
+        self.env = Env(self.backend)
+
+    def test_001_compile(self):
+        """Check that paths are parsed once"""
+
+        compiled = compile_path('DATABASES.replicas.-1.host')
+        self.assertIs(compile_path('DATABASES.replicas.-1.host'), compiled)
+        self.assertEqual(compiled.name, 'DATABASES')
+        self.assertEqual(compiled.steps, (('replicas', None), ('-1', -1),
+                                          ('host', None)))
+        with self.assertRaises(ValueError):
+            compile_path('DATABASES..host')
+
+    def test_002_path(self):
+        """Check reading keys and list items"""
+
+        self.assertEqual(self.env.path('DATABASES.default.HOST'), 'db')
+        self.assertEqual(self.env.path('DATABASES.replicas.1.port'), 6432)
+        self.assertEqual(self.env.path('DATABASES.replicas.-1.host'), 'r2')
+        self.assertEqual(self.env.path('DATABASES.0'), 'zero')
+        self.assertEqual(self.env.path('HOSTS.1'), 'b')
+        self.assertEqual(self.env.path('DATABASES'), self.CONFIG)
+
+    def test_003_default(self):
+        """Check that default is returned for paths not found"""
+
+        for expression in ('MISSING.key', 'DATABASES.other',
+                           'DATABASES.replicas.5', 'DATABASES.replicas.x',
+                           'DATABASES.default.HOST.more'):
+            self.assertEqual(self.env.path(expression, default=1), 1)
+
+    def test_004_wildcard(self):
+        """Check that wildcard selects all values found"""
+
+        self.assertEqual(self.env.path('DATABASES.replicas.*.host'),
+                         ['r1', 'r2'])
+        self.assertEqual(self.env.path('DATABASES.replicas.*.port'), [6432])
+        self.assertEqual(sorted(self.env.path('DATABASES.default.*'),
+                                key=str), [5432, 'db'])
+
+    def test_005_memoized(self):
+        """Check that decoded value is kept until raw value changes"""
+
+        self.env.path('DATABASES.default.HOST')
+        document = self.env._documents['DATABASES'][1]
+        self.env.path('DATABASES.default.PORT')
+        self.assertIs(self.env._documents['DATABASES'][1], document)
+
+        self.env.DATABASES = {'default': {'HOST': 'other'}}
+        self.assertEqual(self.env.path('DATABASES.default.HOST'), 'other')
@@ -0,0 +1,157 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from smart_env import Env
+from smart_env.decoders import JSONDecoder
+from smart_env.prefetch import decode_manifest
+from smart_env.prefetch import load_manifest
+
+
+__all__ = ('PrefetchTestCase',)
+
+
+class PrefetchTestCase(unittest.TestCase):
+    """Test cases for profile-guided prefetch"""
+
+    def setUp(self):
+        self.backend = {'DEBUG': 'true', 'PORT': '8000', 'NAME': 'app',
+                        'HOSTS': "['a', 'b']", 'UNUSED': '1'}
+        self.env = Env(self.backend)
+        self.env.enable_automatic_type_cast()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'manifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_001_recording(self):
+        """Check that manifest lists variables read, with decoders"""
+
+        self.env.start_recording()
+        self.env.DEBUG
+        self.env.get('PORT')
+        self.env['NAME']
+        self.env.HOSTS
+        self.env.MISSING
+        self.env.DEBUG
+        manifest = self.env.stop_recording(self.path)
+
+        self.assertEqual(manifest, load_manifest(self.path))
+        self.assertEqual(
+            [(item['name'], item['decoder'])
+             for item in manifest['variables']],
+            [('DEBUG', 'JSONDecoder'), ('PORT', 'JSONDecoder'),
+             ('NAME', None), ('HOSTS', 'CollectionDecoder'),
+             ('MISSING', None)])
+
+        self.env.PORT
+        self.assertEqual(len(self.env.stop_recording()['variables']), 0)
+
+    def test_002_decode_manifest(self):
+        """Check that values are decoded even if recorded decoder fails"""
+
+        manifest = {'version': 1, 'variables': [
+            {'name': 'PORT', 'decoder': 'JSONDecoder'},
+            {'name': 'HOSTS', 'decoder': 'JSONDecoder'},
+            {'name': 'MISSING', 'decoder': 'JSONDecoder'},
+        ]}
+        self.assertEqual(decode_manifest(manifest, self.backend.get),
+                         {'8000': 8000, "['a', 'b']": ['a', 'b']})
+
+    def test_003_prefetch(self):
+        """Check that prefetched values are used once, while still actual"""
+
+        self.env.start_recording()
+        self.env.PORT
+        self.env.HOSTS
+        self.env.stop_recording(self.path)
+
+        self.env.prefetch(self.path)
+        self.backend['HOSTS'] = "['c']"
+        calls = []
+        original = vars(JSONDecoder)['decode']
+        decode = JSONDecoder.decode
+        JSONDecoder.decode = classmethod(
+            lambda cls, value: calls.append(value) or decode(value))
+        try:
+            self.assertEqual(self.env.PORT, 8000)
+            self.assertEqual(self.env.HOSTS, ['c'])
+            self.assertEqual(self.env.PORT, 8000)
+        finally:
+            JSONDecoder.decode = original
+        self.assertEqual(calls, ["['c']", '8000'])
+
+    def test_004_prefetch_background(self):
+        """Check prefetching in a background thread"""
+
+        manifest = {'version': 1, 'variables': [
+            {'name': 'DEBUG', 'decoder': 'JSONDecoder'}]}
+        thread = self.env.prefetch(manifest, background=True)
+        thread.join()
+        self.assertIs(self.env.DEBUG, True)
+
+    def test_005_manifest_version(self):
+        """Check that manifest of unknown version is rejected"""
+
+        with open(self.path, 'w') as f:
+            f.write('{"version": 0, "variables": []}')
+        with self.assertRaises(ValueError):
+            self.env.prefetch(self.path)
+
+    def test_006_earlier_decoder(self):
+        """Check that value changed since recording is decoded like
+        on read, even by a decoder coming before the recorded one"""
+
+        self.backend['PATH'] = '"a\\/b"'
+        manifest = {'version': 1, 'variables': [
+            {'name': 'PATH', 'decoder': 'CollectionDecoder'}]}
+        self.assertEqual(decode_manifest(manifest, self.backend.get),
+                         {'"a\\/b"': 'a/b'})
+        self.env.prefetch(manifest)
+        self.assertEqual(self.env.PATH, 'a/b')
+
+    def test_007_drop_on_write(self):
+        """Check that values prefetched for variables set, unset
+        or restored through Env are dropped"""
+
+        manifest = {'version': 1, 'variables': [
+            {'name': 'PORT', 'decoder': 'JSONDecoder'},
+            {'name': 'DEBUG', 'decoder': 'JSONDecoder'},
+            {'name': 'HOSTS', 'decoder': 'CollectionDecoder'}]}
+        token = self.env.checkpoint()
+        self.env.PORT = 9000
+        self.env.prefetch(manifest)
+        self.assertEqual(len(self.env._prefetched), 3)
+
+        del self.env.DEBUG
+        self.env.HOSTS = ['c']
+        self.assertEqual(self.env._prefetched, {'9000': 9000})
+        self.env.restore(token)
+        self.assertEqual(self.env._prefetched, {})
+        self.assertEqual(self.env.PORT, 8000)
@@ -0,0 +1,131 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import marshal
+import os
+import shutil
+import tempfile
+import unittest
+
+from smart_env import ENV
+from smart_env.shared import SHARED_PATH_VARIABLE
+from smart_env.shared import SharedConfig
+from smart_env.shared import publish
+
+
+__all__ = ('SharedConfigTestCase',)
+
+
+class SharedConfigTestCase(unittest.TestCase):
+    """Test cases for sharing decoded values between processes"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'segment')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        os.environ.pop(SHARED_PATH_VARIABLE, None)
+        for name in ('SHARED_CONFIG', 'SHARED_FLAG'):
+            os.environ.pop(name, None)
+
+    def test_001_publish_and_attach(self):
+        """Check that published values can be read back"""
+
+        values = {'A': {'key': [1, 2, 3]}, 'B': True, 'C': 'text'}
+        self.assertEqual(publish(values, self.path), 1)
+
+        config = SharedConfig(self.path)
+        self.assertEqual(config.version, 1)
+        self.assertEqual(dict(config), values)
+        self.assertIn('A', config)
+        self.assertNotIn('D', config)
+        self.assertIsInstance(config.raw('A'), memoryview)
+        config.close()
+
+    def test_002_republish(self):
+        """Check that worker detects a new version"""
+
+        publish({'A': 1}, self.path)
+        config = SharedConfig(self.path)
+        self.assertFalse(config.stale)
+        self.assertFalse(config.refresh())
+
+        self.assertEqual(publish({'A': 2}, self.path), 2)
+        self.assertTrue(config.stale)
+        self.assertEqual(config['A'], 1)
+
+        self.assertTrue(config.refresh())
+        self.assertEqual(config.version, 2)
+        self.assertEqual(config['A'], 2)
+        config.close()
+
+    def test_003_invalid_segment(self):
+        """Check that arbitrary file is not accepted as a segment"""
+
+        with open(self.path, 'wb') as f:
+            f.write(b'0' * 64)
+
+        with self.assertRaises(ValueError):
+            SharedConfig(self.path)
+
+    def test_004_env_publish_shared(self):
+        """Check publishing variables through ENV"""
+
+        os.environ['SHARED_CONFIG'] = '{"hosts": ["a", "b"]}'
+        os.environ['SHARED_FLAG'] = 'True'
+
+        path = ENV.publish_shared(
+            ['SHARED_CONFIG', 'SHARED_FLAG', 'SHARED_MISSING'], self.path)
+        self.assertEqual(os.environ[SHARED_PATH_VARIABLE], path)
+
+        config = ENV.attach_shared()
+        self.assertEqual(config['SHARED_CONFIG'], {'hosts': ['a', 'b']})
+        self.assertIs(config['SHARED_FLAG'], True)
+        self.assertNotIn('SHARED_MISSING', config)
+        config.close()
+
+    def test_005_attach_not_published(self):
+        """Check attaching when nothing was published"""
+
+        with self.assertRaises(ValueError):
+            ENV.attach_shared()
+
+    def test_006_refresh_with_raw_views(self):
+        """Check that held raw() views don't break refresh() and close()"""
+
+        publish({'A': 1}, self.path)
+        config = SharedConfig(self.path)
+        view = config.raw('A')
+
+        publish({'A': 2}, self.path)
+        self.assertTrue(config.refresh())
+        self.assertEqual(config['A'], 2)
+        self.assertEqual(marshal.loads(view), 1)
+
+        other = config.raw('A')
+        config.close()
+        self.assertEqual(marshal.loads(other), 2)
+        view.release()
+        other.release()
@@ -0,0 +1,171 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from smart_env import ENV
+from smart_env.sources import SecretsDirectory
+
+
+__all__ = ('SecretsDirectoryTestCase', 'EnvSourcesTestCase')
+
+
+class CountingSecretsDirectory(SecretsDirectory):
+    """Secrets directory which counts file reads"""
+
+    def __init__(self, *args, **kwargs):
+        super(CountingSecretsDirectory, self).__init__(*args, **kwargs)
+        self.reads = 0
+
+    def _read(self, path):
+        self.reads += 1
+        return super(CountingSecretsDirectory, self)._read(path)
+
+
+class SecretsDirectoryTestCase(unittest.TestCase):
+    """Test cases for file-backed secrets source"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, value, directory=None):
+        with open(os.path.join(directory or self.directory, name), 'w') as f:
+            f.write(value)
+
+    def test_001_read_secret(self):
+        """Check reading secrets and listing them"""
+
+        self.write('TOKEN', 'secret')
+        os.mkdir(os.path.join(self.directory, 'subdir'))
+        source = SecretsDirectory(self.directory)
+
+        self.assertEqual(source['TOKEN'], 'secret')
+        self.assertEqual(list(source), ['TOKEN'])
+        self.assertEqual(len(source), 1)
+        self.assertIsNone(source.get('MISSING'))
+        self.assertIsNone(source.get('subdir'))
+        self.assertIsNone(source.get('../TOKEN'))
+
+    def test_002_unchanged_file_is_not_reread(self):
+        """Check that file is read only once if stat() is unchanged"""
+
+        self.write('TOKEN', 'secret')
+        source = CountingSecretsDirectory(self.directory, min_interval=0)
+
+        for _ in range(3):
+            self.assertEqual(source['TOKEN'], 'secret')
+        self.assertEqual(source.reads, 1)
+
+    def test_003_min_interval(self):
+        """Check that changes are not seen until min_interval passes"""
+
+        self.write('TOKEN', 'secret')
+        source = CountingSecretsDirectory(self.directory, min_interval=3600)
+        self.assertEqual(source['TOKEN'], 'secret')
+
+        os.unlink(os.path.join(self.directory, 'TOKEN'))
+        self.assertEqual(source['TOKEN'], 'secret')
+
+        source.min_interval = 0
+        with self.assertRaises(KeyError):
+            source['TOKEN']
+
+    def test_004_atomic_symlink_swap(self):
+        """Check that Kubernetes-like ..data symlink swap is picked up"""
+
+        for version, value in (('..v1', 'old'), ('..v2', 'new')):
+            os.mkdir(os.path.join(self.directory, version))
+            self.write('TOKEN', value, os.path.join(self.directory, version))
+
+        data = os.path.join(self.directory, '..data')
+        os.symlink('..v1', data)
+        os.symlink(os.path.join('..data', 'TOKEN'),
+                   os.path.join(self.directory, 'TOKEN'))
+
+        source = CountingSecretsDirectory(self.directory, min_interval=0)
+        self.assertEqual(list(source), ['TOKEN'])
+        self.assertEqual(source['TOKEN'], 'old')
+
+        tmp_link = os.path.join(self.directory, '..data_tmp')
+        os.symlink('..v2', tmp_link)
+        os.rename(tmp_link, data)
+
+        self.assertEqual(source['TOKEN'], 'new')
+        self.assertEqual(source.reads, 2)
+
+
+class EnvSourcesTestCase(unittest.TestCase):
+    """Test cases for ENV with several sources"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'SOURCE_SECRET'), 'w') as f:
+            f.write('{"user": "admin"}')
+        with open(os.path.join(self.directory, 'SOURCE_VAR'), 'w') as f:
+            f.write('from secrets')
+
+        ENV.disable_automatic_type_cast()
+        self.overlay = {'SOURCE_OVERLAY': 'true'}
+        os.environ['SOURCE_VAR'] = 'from environ'
+        ENV.set_sources([self.overlay, os.environ])
+        ENV.add_secrets_dir(self.directory)
+
+    def tearDown(self):
+        ENV.set_sources([os.environ])
+        ENV.disable_automatic_type_cast()
+        os.environ.pop('SOURCE_VAR', None)
+        shutil.rmtree(self.directory)
+
+    def test_001_lookup_order(self):
+        """Check that sources are looked up in their order"""
+
+        self.assertEqual(ENV.SOURCE_OVERLAY, 'true')
+        self.assertEqual(ENV.SOURCE_VAR, 'from environ')
+        self.assertEqual(ENV['SOURCE_SECRET'], '{"user": "admin"}')
+
+        del ENV.SOURCE_VAR
+        self.assertEqual(ENV.SOURCE_VAR, 'from secrets')
+        self.assertIsNone(ENV.SOURCE_MISSING)
+
+    def test_002_decode(self):
+        """Check that values from all sources are decoded"""
+
+        ENV.enable_automatic_type_cast()
+        self.assertIs(ENV.SOURCE_OVERLAY, True)
+        self.assertEqual(ENV.SOURCE_SECRET, {'user': 'admin'})
+
+    def test_003_mapping(self):
+        """Check that all sources are listed"""
+
+        for name in ('SOURCE_OVERLAY', 'SOURCE_SECRET', 'SOURCE_VAR'):
+            self.assertIn(name, ENV)
+            self.assertIn(name, list(ENV))
+            self.assertIn(name, dir(ENV))
+        self.assertEqual(len(ENV), len(list(ENV)))
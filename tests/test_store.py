@@ -0,0 +1,118 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from smart_env import Env
+from smart_env.store import CompactStore
+from smart_env.store import deep_sizeof
+
+
+__all__ = ('CompactStoreTestCase', 'EnvCompactStoreTestCase')
+
+
+class CompactStoreTestCase(unittest.TestCase):
+    """Test cases for memory-compact store of decoded values"""
+
+    def test_001_compact_keeps_values(self):
+        """Check that compacted value is equal to the source one"""
+
+        value = {'key': ['a', {'nested': (1, 2)}, {3}], 'other': None}
+        self.assertEqual(CompactStore().compact(value), value)
+
+    def test_002_interning(self):
+        """Check that dict keys and short strings are shared"""
+
+        store = CompactStore(max_string_length=8)
+        first = store.add('1', {''.join(['ke', 'y']): ''.join(['sh', 'ort'])})
+        second = store.add('2', {''.join(['ke', 'y']): ''.join(['sh', 'ort'])})
+
+        self.assertIs(list(first)[0], list(second)[0])
+        self.assertIs(first['key'], second['key'])
+
+        long_value = store.compact(''.join(['x'] * 9))
+        self.assertIsNot(long_value, store.compact(''.join(['x'] * 9)))
+
+    def test_003_lists_as_tuples(self):
+        """Check optional conversion of lists into tuples"""
+
+        value = {'list': [1, [2, 3]]}
+        self.assertEqual(CompactStore(lists_as_tuples=True).compact(value),
+                         {'list': (1, (2, 3))})
+        self.assertEqual(CompactStore().compact(value), value)
+
+    def test_004_memory_usage(self):
+        """Check that shared objects are counted once"""
+
+        shared = ['value'] * 10
+        self.assertEqual(deep_sizeof(shared, shared), deep_sizeof(shared))
+
+        store = CompactStore()
+        self.assertEqual(store.memory_usage(), 0)
+        store.add('[1]', [1])
+        self.assertGreater(store.memory_usage(), 0)
+        store.clear()
+        self.assertEqual(store.memory_usage(), 0)
+
+    def test_005_bounded(self):
+        """Check that least recently used values are dropped"""
+
+        store = CompactStore(max_entries=2)
+        store.add('1', 1)
+        store.add('2', 2)
+        store.get('1')
+        store.add('3', 3)
+        self.assertEqual(store.entries, 2)
+        self.assertEqual(store.get('1'), 1)
+        with self.assertRaises(KeyError):
+            store.get('2')
+
+
+class EnvCompactStoreTestCase(unittest.TestCase):
+    """Test cases for compact store usage in Env"""
+
+    def test_001_identical_values_are_shared(self):
+        """Check that identical raw values share decoded object"""
+
+        env = Env({'A': '{"hosts": ["a", "b"]}', 'B': '{"hosts": ["a", "b"]}'})
+        env.enable_automatic_type_cast()
+        store = env.enable_compact_store()
+
+        self.assertEqual(env.A, {'hosts': ['a', 'b']})
+        self.assertIs(env.A, env.B)
+        self.assertGreater(store.memory_usage(), 0)
+
+        env.disable_compact_store()
+        self.assertIsNot(env.A, env.B)
+
+    def test_002_changing_values(self):
+        """Check that store doesn't grow when a value keeps changing"""
+
+        env = Env({})
+        env.enable_automatic_type_cast()
+        store = env.enable_compact_store(max_entries=8)
+        for i in range(100):
+            env.CONFIG = {'version': i}
+            self.assertEqual(env.CONFIG, {'version': i})
+        self.assertEqual(store.entries, 8)
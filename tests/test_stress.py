@@ -0,0 +1,86 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import os
+import unittest
+
+import six
+
+from smart_env import cli
+from smart_env.stress import percentile
+from smart_env.stress import run_stress
+
+
+__all__ = ('StressTestCase',)
+
+
+class StressTestCase(unittest.TestCase):
+    """Test cases for stress test harness"""
+
+    def test_001_percentile(self):
+        """Check nearest-rank percentiles"""
+
+        values = list(range(101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_002_consistent(self):
+        """Check that consistent reads from many threads are never torn"""
+
+        results = run_stress(threads=8, keys=4, write_ratio=0.3,
+                             operations=300)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(results['inconsistencies'], 0)
+        self.assertEqual(results['reads']['count'] +
+                         results['writes']['count'], 8 * 300)
+        self.assertGreater(results['throughput'], 0)
+        self.assertLessEqual(results['reads']['p50'],
+                             results['reads']['p99'])
+        self.assertFalse([name for name in os.environ
+                          if name.startswith('SMART_ENV_STRESS_')])
+
+    def test_003_deterministic(self):
+        """Check that the same seed gives the same mix of operations"""
+
+        counts = [run_stress(threads=2, operations=200, seed=1,
+                             read_mode='get')['writes']['count']
+                  for _ in range(2)]
+        self.assertEqual(counts[0], counts[1])
+
+        with self.assertRaises(ValueError):
+            run_stress(read_mode='unknown')
+
+    def test_004_processes(self):
+        """Check running stress test in many processes from CLI"""
+
+        stdout = six.StringIO()
+        code = cli.main(['stress', '--processes', '2', '--threads', '2',
+                         '--operations', '50'], {}, stdout)
+        self.assertEqual(code, 0)
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(results['config']['processes'], 2)
+        self.assertEqual(results['reads']['count'] +
+                         results['writes']['count'], 2 * 2 * 50)
@@ -0,0 +1,216 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from smart_env import Env
+from smart_env import shared
+from smart_env.testing import EnvIsolationMixin
+from smart_env.testing import isolated_env
+from smart_env.testing import pytest_fixture
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+
+__all__ = ('CheckpointTestCase', 'EnvIsolationMixinTestCase')
+
+
+PYTEST_CONFTEST = """
+from smart_env import Env
+from smart_env import testing
+
+ENV = Env({'A': '1'})
+my_env = testing.pytest_fixture(ENV, name='my_env')
+"""
+
+PYTEST_TESTS = """
+from conftest import ENV
+
+
+def test_change(my_env):
+    assert my_env is ENV
+    my_env.A = 2
+    my_env.B = 3
+
+
+def test_unchanged(my_env):
+    assert dict(my_env) == {'A': '1'}
+
+
+def test_unchanged_after_all():
+    assert dict(ENV) == {'A': '1'} and ENV._journal is False
+"""
+
+
+class CheckpointTestCase(unittest.TestCase):
+    """Test cases for checkpoints of variables"""
+
+    def setUp(self):
+        self.backend = {'A': '1', 'B': '2'}
+        self.env = Env(self.backend)
+
+    def test_001_restore(self):
+        """Check that changes made through Env are undone"""
+
+        token = self.env.checkpoint()
+        self.env.A = 10
+        self.env.A = 11
+        del self.env.B
+        self.env.C = 3
+        self.env.update({'D': 4, 'C': None})
+        self.env.set_bytes('E', b'5')
+        self.assertEqual(len(self.env._journal), 7)
+
+        self.env.restore(token)
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+        self.assertIs(self.env._journal, False)
+
+        with self.assertRaises(ValueError):
+            self.env.restore(token)
+
+    def test_002_nested(self):
+        """Check restoring nested checkpoints"""
+
+        outer = self.env.checkpoint()
+        self.env.A = 10
+        inner = self.env.checkpoint()
+        self.env.A = 20
+        self.env.B = 30
+
+        self.env.restore(inner)
+        self.assertEqual(self.backend, {'A': '10', 'B': '2'})
+
+        inner = self.env.checkpoint()
+        self.env.C = 40
+        self.env.restore(outer)
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+        with self.assertRaises(ValueError):
+            self.env.restore(inner)
+
+    def test_003_interpolation(self):
+        """Check that restored variables are expanded again"""
+
+        self.env.enable_interpolation()
+        self.backend['URL'] = 'http://${A}'
+        self.assertEqual(self.env.URL, 'http://1')
+
+        with isolated_env(self.env) as env:
+            env.A = 'host'
+            self.assertEqual(env.URL, 'http://host')
+        self.assertEqual(self.env.URL, 'http://1')
+
+    def test_004_nested_before_writes(self):
+        """Check restoring nested checkpoints taken before any write"""
+
+        outer = self.env.checkpoint()
+        inner = self.env.checkpoint()
+        self.env.X = 1
+        self.env.restore(inner)
+        self.env.Y = 2
+        self.env.restore(outer)
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+
+        with isolated_env(self.env) as env:
+            with isolated_env(env):
+                env.X = 1
+            env.Y = 2
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+
+    def test_005_publish_shared(self):
+        """Check that path of published values is restored"""
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with isolated_env(self.env) as env:
+            env.publish_shared(['A'], os.path.join(directory, 'config'))
+            self.assertIn(shared.SHARED_PATH_VARIABLE, env)
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+
+    def test_006_stale_token(self):
+        """Check that token of restored checkpoint is not accepted
+        for a later one"""
+
+        first = self.env.checkpoint()
+        self.env.restore(first)
+        second = self.env.checkpoint()
+        self.env.A = 10
+        with self.assertRaises(ValueError):
+            self.env.restore(first)
+        self.assertEqual(self.backend['A'], '10')
+        self.env.restore(second)
+        self.assertEqual(self.backend, {'A': '1', 'B': '2'})
+
+
+class EnvIsolationMixinTestCase(EnvIsolationMixin, unittest.TestCase):
+    """Test cases for unittest mixin and pytest fixture"""
+
+    env = Env({'A': '1'})
+
+    def test_001_change(self):
+        """Change a variable, which must be undone by mixin"""
+
+        self.env.A = 2
+        self.env.B = 3
+
+    def test_002_unchanged(self):
+        """Check that changes of previous test were undone"""
+
+        self.assertEqual(dict(self.env), {'A': '1'})
+
+    @unittest.skipIf(pytest is None, "pytest is not installed")
+    def test_003_pytest_fixture(self):
+        """Check that pytest fixture is created"""
+
+        fixture = pytest_fixture(self.env, name='my_env')
+        self.assertTrue(callable(fixture))
+
+    @unittest.skipIf(pytest is None, "pytest is not installed")
+    def test_004_pytest_fixture_undoes_changes(self):
+        """Check that changes made in a test using pytest fixture are
+        undone after it"""
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'conftest.py'), 'w') as f:
+            f.write(PYTEST_CONFTEST)
+        with open(os.path.join(directory, 'test_fixture.py'), 'w') as f:
+            f.write(PYTEST_TESTS)
+
+        environ = dict(os.environ, PYTHONPATH=os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+             directory], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            env=environ)
+        output = process.communicate()[0].decode()
+        self.assertEqual(process.returncode, 0, output)
+        self.assertIn('3 passed', output)
@@ -0,0 +1,114 @@
+"""
+MIT License
+
+Copyright (c) 2020 Alex Sokolov
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from smart_env import Env
+from smart_env.benchmarks import split_tree
+from smart_env.tree import build_tree
+
+
+__all__ = ('TreeTestCase',)
+
+
+class TreeTestCase(unittest.TestCase):
+    """Test cases for building nested configs from variable names"""
+
+    def setUp(self):
+        self.backend = {
+            'APP__DB__HOST': 'db',
+            'APP__DB__PORT': '5432',
+            'APP__CACHE__1__URL': 'redis://b',
+            'APP__CACHE__0__URL': 'redis://a',
+            'APP__CACHE__0__OPTIONS': '{"timeout": 1}',
+            'APP': 'ignored',
+            'APPLICATION__NAME': 'ignored',
+        }
+        self.env = Env(self.backend)
+
+    def test_001_build_tree(self):
+        """Check building nested dicts and lists"""
+
+        self.assertEqual(build_tree([('A.B', 1), ('A.C', 2), ('L.1', 'b'),
+                                     ('L.0', 'a'), ('L.10', 'c')], '.'),
+                         {'A': {'B': 1, 'C': 2}, 'L': ['a', 'b', 'c']})
+        self.assertEqual(build_tree([('A', {'x': 1}), ('A.B', 2)], '.'),
+                         {'A': {'B': 2}})
+        self.assertEqual(build_tree([('A.B', 2), ('A', 1)], '.'),
+                         {'A': {'B': 2}})
+        self.assertEqual(build_tree([], '.'), {})
+
+    def test_002_tree(self):
+        """Check that leaves of tree are decoded"""
+
+        self.assertEqual(self.env.tree('APP'), {
+            'DB': {'HOST': 'db', 'PORT': 5432},
+            'CACHE': [{'URL': 'redis://a', 'OPTIONS': {'timeout': 1}},
+                      {'URL': 'redis://b'}],
+        })
+        self.assertEqual(self.env.tree('APP__DB', sep='__'),
+                         {'HOST': 'db', 'PORT': 5432})
+        self.assertEqual(self.env.tree('APP__DB__PORT'), {})
+        self.assertEqual(self.env.tree('APP', sep='__DB__'),
+                         {'HOST': 'db', 'PORT': 5432})
+
+    def test_003_cache(self):
+        """Check that tree is cached until variables are changed"""
+
+        tree = self.env.tree('APP')
+        self.assertIs(self.env.tree('APP'), tree)
+
+        self.env.APP__DB__PORT = 6432
+        self.assertEqual(self.env.tree('APP')['DB']['PORT'], 6432)
+
+        del self.env.APP__DB
+        del self.env.APP__DB__HOST
+        self.assertEqual(self.env.tree('APP')['DB'], {'PORT': 6432})
+
+    def test_004_split_by_hand(self):
+        """Check that tree() gives the same result as splitting names
+        by hand, like the benchmark does"""
+
+        self.assertEqual(split_tree(self.backend, 'APP', '__')['DB'],
+                         self.env.tree('APP')['DB'])
+
+    def test_005_write_while_building(self):
+        """Check that tree built while a variable was changed is not
+        cached as current"""
+
+        writes = []
+
+        class Backend(dict):
+            def get(self, name, default=None):
+                value = dict.get(self, name, default)
+                if name == 'APP__DB__HOST' and not writes:
+                    # Another thread changes variable right after it
+                    # was read
+                    writes.append(name)
+                    env.APP__DB__HOST = 'replica'
+                return value
+
+        env = Env(Backend(self.backend))
+        self.assertEqual(env.tree('APP')['DB']['HOST'], 'db')
+        self.assertEqual(env.tree('APP')['DB']['HOST'], 'replica')